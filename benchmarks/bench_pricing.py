@@ -0,0 +1,231 @@
+# Benchmarks for the pricing engine.
+#
+#   python benchmarks/bench_pricing.py                       # 1k, 100k and 1M rows
+#   python benchmarks/bench_pricing.py --sizes 1000 100000 --output before.json
+#   python benchmarks/bench_pricing.py --compare before.json --output after.json
+#
+# Catalogs are synthetic: MRPs, discounts and style codes are resampled from
+# sku.txt, Myntra brand/category/gender from MYNTRA_COMMISSION_DATA.
+import argparse
+import json
+import os
+import platform as platform_module
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from vardhman_pricing import (
+    JIOMART_COMMISSION_RATES,
+    MYNTRA_COMMISSION_DATA,
+    find_discount_for_target_profit,
+    perform_calculations,
+    run_bulk_processing,
+    run_discount_sweep,
+)
+
+
+PLATFORMS = ('Myntra', 'FirstCry', 'Ajio', 'Jiomart', 'Meesho', 'Snapdeal')
+ZONES = ('Local', 'Regional', 'National')
+WEIGHTS_KG = (0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 4.0)
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+FANOUT = 8 # Size variants per style in the fan-out catalogs
+SWEEP_SHAPE = (10_000, 200) # SKUs x grid points
+MODES = ('Check With Selling Price', 'Check With Cost Price')
+
+
+def load_sku_sample(path=os.path.join(REPO_ROOT, 'sku.txt')):
+    sample = pd.read_csv(path, sep='\t', dtype={'sku code': str})
+    return sample.dropna(subset=['mrp', 'sku code'])
+
+
+def make_catalog(n, seed=0, sample=None, fanout=1):
+    # Same layout as the Consolidated template, read through the app's schema.
+    # fanout > 1 gives each style that many size variants with identical pricing inputs, as in sku.txt.
+    rng = np.random.default_rng(seed)
+    sample = load_sku_sample() if sample is None else sample
+    if fanout > 1:
+        styles = make_catalog(-(-n // fanout), seed, sample)
+        df = styles.iloc[np.repeat(np.arange(len(styles)), fanout)[:n]].reset_index(drop=True)
+        df['seller_sku_code'] = df['seller_sku_code'] + '-' + (np.arange(n) % fanout).astype(str)
+        return df
+    rows = rng.integers(0, len(sample), n)
+    mrp = sample['mrp'].to_numpy(dtype=float)[rows]
+    discount = sample['discount'].fillna(0).to_numpy(dtype=float)[rng.integers(0, len(sample), n)]
+    skus = sample['sku code'].to_numpy(dtype=object)[rows]
+
+    combos = [(b, c, g) for b, cats in MYNTRA_COMMISSION_DATA.items() for c, gens in cats.items() for g in gens]
+    combo = rng.integers(0, len(combos), n)
+    jio_categories = np.array(sorted(JIOMART_COMMISSION_RATES), dtype=object)
+
+    df = pd.DataFrame({
+        'platform': pd.Categorical(np.array(PLATFORMS, dtype=object)[rng.integers(0, len(PLATFORMS), n)]),
+        'seller_sku_code': [f"{sku}#{i}" for i, sku in enumerate(skus)],
+        'product_mrp': mrp,
+        'product_cost': np.round(mrp * rng.uniform(0.2, 0.55, n), 2),
+        'selling_price': mrp - discount * rng.integers(0, 6, n),
+        'myntra_brand': pd.Categorical([combos[i][0] for i in combo]),
+        'myntra_article_type': pd.Categorical([combos[i][1] for i in combo]),
+        'myntra_gender': pd.Categorical([combos[i][2] for i in combo]),
+        'jiomart_category': pd.Categorical(jio_categories[rng.integers(0, len(jio_categories), n)]),
+        'product_weight_kg': np.array(WEIGHTS_KG)[rng.integers(0, len(WEIGHTS_KG), n)],
+        'shipping_zone': pd.Categorical(np.array(ZONES, dtype=object)[rng.integers(0, len(ZONES), n)]),
+    })
+    return df
+
+
+def _row_args(df, i, platform):
+    row = df.iloc[i]
+    return dict(
+        mrp=row['product_mrp'], product_cost=row['product_cost'], platform=platform,
+        myntra_new_brand=row['myntra_brand'], myntra_new_category=row['myntra_article_type'],
+        myntra_new_gender=row['myntra_gender'], weight_in_kg=row['product_weight_kg'],
+        shipping_zone=row['shipping_zone'], jiomart_category=row['jiomart_category'], jiomart_benefit_rate=0.01,
+        meesho_charge_rate=0.05,
+    )
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench_perform_calculations(df, calls, repeat):
+    results = []
+    for platform in PLATFORMS:
+        args = [_row_args(df, i, platform) for i in range(calls)]
+        discounts = (df['product_mrp'] - df['selling_price']).to_numpy()[:calls]
+
+        def run():
+            for kwargs, discount in zip(args, discounts):
+                perform_calculations(discount=discount, wrong_defective_price=kwargs['mrp'] - discount, **kwargs)
+        seconds = best_of(run, repeat)
+        results.append({'name': 'perform_calculations', 'platform': platform, 'size': calls,
+                        'seconds': seconds, 'per_item_us': seconds / calls * 1e6})
+    return results
+
+
+def bench_find_discount(df, calls, repeat, target_margin=100.0):
+    results = []
+    for platform in PLATFORMS:
+        args = [_row_args(df, i, platform) for i in range(calls)]
+
+        def run():
+            for kwargs in args:
+                find_discount_for_target_profit(target_profit=target_margin, **kwargs)
+        seconds = best_of(run, repeat)
+        results.append({'name': 'find_discount_for_target_profit', 'platform': platform, 'size': calls,
+                        'seconds': seconds, 'per_item_us': seconds / calls * 1e6})
+    return results
+
+
+def bench_bulk(df, repeat, workers=1, fanout=1):
+    results = []
+    for mode in MODES:
+        seconds = best_of(lambda: run_bulk_processing(
+            df, 'Consolidated', mode, target_margin=100.0, meesho_charge=0.05, jio_benefit=0.01, workers=workers
+        ), repeat)
+        results.append({'name': 'run_bulk_processing', 'mode': mode, 'platform': 'Consolidated', 'size': len(df),
+                        'fanout': fanout, 'workers': workers, 'seconds': seconds, 'per_item_us': seconds / len(df) * 1e6})
+    return results
+
+
+def bench_sweep(df, points, repeat):
+    seconds = best_of(lambda: run_discount_sweep(
+        df, 'Consolidated', step=10.0, points=points, meesho_charge=0.05, jio_benefit=0.01
+    ), repeat)
+    return [{'name': 'run_discount_sweep', 'platform': 'Consolidated', 'size': len(df) * points,
+             'seconds': seconds, 'per_item_us': seconds / (len(df) * points) * 1e6}]
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform_module.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def result_key(result):
+    return (result['name'], result.get('platform'), result.get('mode'), result['size'], result.get('fanout', 1))
+
+
+def compare(previous, current):
+    before = {result_key(result): result for result in previous['results']}
+    print(f"\n{'benchmark':<60} {'before':>10} {'after':>10} {'change':>8}")
+    for result in current['results']:
+        old = before.get(result_key(result))
+        if old is None:
+            continue
+        label = ' / '.join(str(part) for part in result_key(result)[:-1] if part is not None)
+        if result.get('fanout', 1) > 1:
+            label += f" / fan-out {result['fanout']}"
+        change = result['seconds'] / old['seconds'] - 1 if old['seconds'] else float('nan')
+        print(f"{label:<60} {old['seconds']:>9.4f}s {result['seconds']:>9.4f}s {change:>+7.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the pricing engine on synthetic catalogs.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="Bulk catalog sizes in rows")
+    parser.add_argument('--calls', type=int, default=2_000, help="Scalar calls per platform")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeats per benchmark (the fastest is kept)")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for run_bulk_processing")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    sample = load_sku_sample()
+    results = []
+    scalar_df = make_catalog(args.calls, args.seed, sample)
+    for bench in (bench_perform_calculations, bench_find_discount):
+        for result in bench(scalar_df, args.calls, args.repeat):
+            print(f"{result['name']:<34} {result['platform']:<10} {result['per_item_us']:>10.1f} us/call")
+            results.append(result)
+
+    for size in args.sizes:
+        df = make_catalog(size, args.seed, sample)
+        repeat = args.repeat if size <= 100_000 else 1
+        for result in bench_bulk(df, repeat, args.workers):
+            print(f"{result['name']:<34} {result['mode']:<26} {size:>9,} rows {result['seconds']:>9.3f}s")
+            results.append(result)
+        df = make_catalog(size, args.seed, sample, FANOUT)
+        for result in bench_bulk(df, repeat, args.workers, FANOUT):
+            print(f"{result['name']:<34} {result['mode']:<26} {size:>9,} rows {result['seconds']:>9.3f}s (fan-out {FANOUT})")
+            results.append(result)
+
+    sweep_skus, sweep_points = SWEEP_SHAPE
+    for result in bench_sweep(make_catalog(sweep_skus, args.seed, sample), sweep_points, args.repeat):
+        print(f"{result['name']:<34} {sweep_skus:,} x {sweep_points} grid {result['seconds']:>15.3f}s")
+        results.append(result)
+
+    report = {'environment': environment(), 'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
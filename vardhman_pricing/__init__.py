@@ -0,0 +1,104 @@
+import importlib
+
+# Public names and the submodule defining each. Submodules are imported on first
+# access so that scalar pricing (rates, engine) starts without loading pandas.
+_EXPORTS = {
+    'DEFAULT_RATE_CARD_PATH': 'rates',
+    'JIOMART_COMMISSION_RATES': 'rates',
+    'JIOMART_SHIPPING_RATES': 'rates',
+    'JIOMART_SHIPPING_ZONES': 'rates',
+    'MYNTRA_COMMISSION_DATA': 'rates',
+    'RateCard': 'rates',
+    'active_rate_card': 'rates',
+    'compile_rate_card': 'rates',
+    'compile_slab_table': 'rates',
+    'load_rate_card': 'rates',
+    'rate_card_digest': 'rates',
+    'use_rate_card': 'rates',
+
+    'CALCULATION_FIELDS': 'engine',
+    'CalculationResult': 'engine',
+    'calculate_taxable_amount_value': 'engine',
+    'find_discount_for_target_profit': 'engine',
+    'find_discount_for_target_profit_columnar': 'engine',
+    'jiomart_fee_cap_array': 'engine',
+    'jiomart_fixed_fee_array': 'engine',
+    'jiomart_shipping_fee_array': 'engine',
+    'jiomart_shipping_zone_codes': 'engine',
+    'perform_calculations': 'engine',
+    'perform_calculations_channels': 'engine',
+    'perform_calculations_columnar': 'engine',
+
+    'CHANNELS': 'bulk',
+    'DEFAULT_CHUNK_SIZE': 'bulk',
+    'BulkInputError': 'bulk',
+    'BulkPipeline': 'bulk',
+    'run_bulk_processing': 'bulk',
+    'stream_bulk_processing': 'bulk',
+    'run_channel_comparison': 'bulk',
+    'join_discount_sheet': 'bulk',
+    'run_discount_sheet_processing': 'bulk',
+    'stream_discount_sheet_processing': 'bulk',
+
+    'DEFAULT_STREAMING_THRESHOLD_MB': 'ingest',
+    'apply_sku_schema': 'ingest',
+    'coercion_message': 'ingest',
+    'estimate_upload_bytes': 'ingest',
+    'iter_sku_file_chunks': 'ingest',
+    'read_sku_file': 'ingest',
+
+    'DEFAULT_CACHE_DIR': 'cache',
+    'DEFAULT_CACHE_MAX_MB': 'cache',
+    'FrameCache': 'cache',
+    'read_sku_file_cached': 'cache',
+
+    'ORDER_DATE_COLUMN': 'history',
+    'RATE_CARD_HISTORY_DIR': 'history',
+    'RateCardHistory': 'history',
+    'load_rate_card_history': 'history',
+    'rate_card_files': 'history',
+
+    'StageProfiler': 'profiling',
+
+    'BulkJob': 'jobs',
+    'bulk_pricing_job': 'jobs',
+
+    'EXPORT_FORMATS': 'export',
+    'ResultsWriter': 'export',
+    'export_format_for': 'export',
+    'write_results': 'export',
+
+    'SKU_SEARCH_LIMIT': 'catalog',
+    'SkuIndex': 'catalog',
+    'build_sku_index': 'catalog',
+    'duplicate_sku_message': 'catalog',
+    'find_sku_column': 'catalog',
+    'lookup_sku_row': 'catalog',
+    'search_skus': 'catalog',
+    'sku_positions': 'catalog',
+
+    'RESULTS_PAGE_SIZES': 'view',
+    'ResultsQuery': 'view',
+    'ResultsView': 'view',
+
+    'DiscountSweep': 'sweep',
+    'discount_grid': 'sweep',
+    'run_discount_sweep': 'sweep',
+    'sweep_frame': 'sweep',
+    'write_sweep_archive': 'sweep',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
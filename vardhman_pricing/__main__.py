@@ -0,0 +1,109 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+
+PLATFORMS = ('Consolidated', 'Myntra', 'FirstCry', 'Ajio', 'Jiomart', 'Meesho', 'Snapdeal')
+MODES = {
+    'selling-price': 'Check With Selling Price',
+    'cost-price': 'Check With Cost Price',
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m vardhman_pricing',
+        description="Price a SKU catalog (CSV or XLSX) and write the results as CSV, XLSX or Parquet, without starting Streamlit."
+    )
+    parser.add_argument('input', help="SKU file, in the same layout as the app's templates")
+    parser.add_argument('-o', '--output', help="Results file (default: <input>_results.csv; '-' for stdout)")
+    parser.add_argument('--format', choices=('csv', 'csv.gz', 'xlsx', 'parquet'),
+                        help="Results format (default: from the output extension, else csv)")
+    parser.add_argument('--platform', choices=PLATFORMS, default='Consolidated',
+                        help="Platform for every row, or Consolidated to use the file's 'platform' column")
+    parser.add_argument('--mode', choices=list(MODES), default='selling-price',
+                        help="selling-price: profit at the file's selling_price; cost-price: discount for a target margin")
+    parser.add_argument('--target-margin', type=float, default=100.0, help="Target margin in Rs per SKU (cost-price mode)")
+    parser.add_argument('--meesho-charge', type=float, default=5.0, help="Meesho charge in percent")
+    parser.add_argument('--jio-benefit', type=float, default=1.0, help="Jiomart benefit rate in percent")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--chunk-size', type=int, help="Rows per shard / streamed chunk")
+    parser.add_argument('--stream', action='store_true',
+                        help="Always read and write in chunks (otherwise only above the streaming threshold)")
+    parser.add_argument('--streaming-threshold-mb', type=float,
+                        help="Estimated in-memory size above which the file is streamed")
+    parser.add_argument('--rate-history', nargs='?', const='', metavar='DIR',
+                        help="Price each row with the rate card in effect on its order_date, from the dated rate-card "
+                             "files in DIR (default: the directory holding the current rate card)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from .bulk import DEFAULT_CHUNK_SIZE, BulkInputError, run_bulk_processing, stream_bulk_processing
+    from .export import ResultsWriter, export_format_for
+    from .history import RATE_CARD_HISTORY_DIR, load_rate_card_history
+    from .ingest import (
+        DEFAULT_STREAMING_THRESHOLD_MB, coercion_message, estimate_upload_bytes, iter_sku_file_chunks, read_sku_file,
+    )
+
+    def warn(message):
+        print(f"warning: {message}", file=sys.stderr)
+
+    output = args.output or os.path.splitext(args.input)[0] + '_results.csv'
+    export_format = args.format or export_format_for(output)
+    if output == '-':
+        output = sys.stdout.buffer
+    chunk_size = args.chunk_size or DEFAULT_CHUNK_SIZE
+    threshold_mb = args.streaming_threshold_mb or DEFAULT_STREAMING_THRESHOLD_MB
+    options = dict(
+        target_margin=args.target_margin,
+        meesho_charge=args.meesho_charge / 100.0,
+        jio_benefit=args.jio_benefit / 100.0,
+        workers=args.workers,
+        chunk_size=chunk_size,
+        on_warning=warn,
+    )
+
+    if args.rate_history is not None:
+        try:
+            options['rate_history'] = load_rate_card_history(args.rate_history or RATE_CARD_HISTORY_DIR)
+        except (OSError, ValueError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+
+    started = time.perf_counter()
+    coerced = {}
+    try:
+        with open(args.input, 'rb') as file:
+            stream = args.stream or estimate_upload_bytes(file, args.input) > threshold_mb * 1024 * 1024
+            with ResultsWriter(output, export_format, sheet_name=args.platform) as writer:
+                if stream:
+                    # Closed here, while the file is still open, if pricing stops part-way
+                    with contextlib.closing(iter_sku_file_chunks(file, args.input, chunk_size, coerced)) as chunks:
+                        rows = stream_bulk_processing(chunks, writer, args.platform, MODES[args.mode], **options)
+                else:
+                    df = read_sku_file(file, args.input, coerced)
+                    results = run_bulk_processing(df, args.platform, MODES[args.mode], **options)
+                    rows = len(results)
+                    for start in range(0, rows, chunk_size):
+                        writer.write(results.iloc[start:start + chunk_size])
+    except BulkInputError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if coerced:
+        warn(coercion_message(coerced))
+    destination = 'stdout' if output is sys.stdout.buffer else output
+    print(f"Priced {rows} SKU(s) in {time.perf_counter() - started:.2f}s -> {destination}", file=sys.stderr)
+    return 0 if rows else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
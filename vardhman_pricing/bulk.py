@@ -0,0 +1,654 @@
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from .engine import (
+    find_discount_for_target_profit_columnar,
+    jiomart_fee_cap_array,
+    perform_calculations_channels,
+    perform_calculations_columnar,
+)
+from .catalog import sku_positions
+from .export import ResultsWriter
+from .history import ORDER_DATE_COLUMN
+from .ingest import parse_float_column
+from .profiling import _no_lap
+from .rates import active_rate_card
+
+
+DEFAULT_CHUNK_SIZE = 50_000 # Rows per shard in parallel mode
+DEDUPE_MAX_UNIQUE_SHARE = 0.8 # Price unique input rows only when at most this share of rows is distinct
+PRICING_INPUT_COLUMNS = ('mrp', 'cost', 'selling_price', 'platform', 'brand', 'category', 'gender',
+                         'kuchipoo_royalty', 'weight', 'zone', 'jio_category', 'royalty')
+
+
+class BulkInputError(ValueError):
+    pass
+
+
+def _failed_rows_message(failed_skus):
+    return f"Failed to process {len(failed_skus)} SKU(s) with blank or non-numeric values: {', '.join(failed_skus[:10])}" + (" ..." if len(failed_skus) > 10 else "")
+
+
+def royalty_flags(sku, brand):
+    # (Myntra KUCHIPOO royalty, other-portal royalty) per row, before the platform is applied
+    sku_series = pd.Series(sku, dtype='string[pyarrow]') # Arrow string kernels; several times faster than object strings
+    # Myntra logic: STAYS "startswith"
+    is_myntra_royalty_sku = (sku_series.str.startswith("DKUC") | sku_series.str.startswith("MKUC")).to_numpy(dtype=bool)
+    if brand is not None:
+        kuchipoo_royalty = np.asarray(brand == 'KUCHIPOO') & is_myntra_royalty_sku
+    else:
+        kuchipoo_royalty = np.zeros(len(sku_series), dtype=bool)
+    # Other portals logic: CHANGES TO "in" and INCLUDES MEESHO
+    is_other_portal_royalty_sku = sku_series.str.contains("DKUC|MKUC").to_numpy(dtype=bool)
+    return kuchipoo_royalty, is_other_portal_royalty_sku
+
+
+def prepare_bulk_columns(df, bulk_platform, mode, on_warning=None, failed_skus=None, profiler=None, passthrough=None):
+    # Column mapping, parsing and royalty checks. Returns compact column buffers
+    # (float arrays, bool flags and Categoricals) or None when no row is usable.
+    # Rejected SKUs are appended to failed_skus when given, otherwise reported at once.
+    # passthrough: {input column: output name} copied unchanged for the kept rows.
+    warn = on_warning or (lambda message: warnings.warn(message, stacklevel=3))
+    lap = profiler.lap if profiler else _no_lap
+    cols = df.columns
+    
+    # --- Dynamic Column Mapping ---
+    sku_col_name = None
+    if 'seller_sku_code' in cols: sku_col_name = 'seller_sku_code'
+    elif 'sku_code' in cols: sku_col_name = 'sku_code'
+    
+    mrp_col_name = None
+    if 'product_mrp' in cols: mrp_col_name = 'product_mrp'
+    elif 'mrp' in cols: mrp_col_name = 'mrp'
+    elif 'product_mrp_' in cols: mrp_col_name = 'product_mrp_' 
+    
+    cost_col_name = None
+    if 'product_cost' in cols: cost_col_name = 'product_cost'
+    elif 'cost_price' in cols: cost_col_name = 'cost_price'
+
+    # --- Selling Price Column ---
+    selling_price_col_name = None
+    if 'selling_price' in cols: selling_price_col_name = 'selling_price'
+
+    required_cols_check = [sku_col_name, mrp_col_name, cost_col_name]
+    if mode == 'Check With Selling Price': # Profit Calculation
+        if not selling_price_col_name:
+            raise BulkInputError("File missing required column: 'selling_price' is needed for 'Check With Selling Price' mode.")
+        required_cols_check.append(selling_price_col_name)
+
+    if not all(required_cols_check):
+        raise BulkInputError("File missing required columns. Need SKU, MRP, and Cost. Check template downloads.")
+
+    # --- Check for Consolidated ---
+    platform_col_name = None
+    if bulk_platform == 'Consolidated':
+        if 'platform' in cols:
+            platform_col_name = 'platform'
+        else:
+            raise BulkInputError("Consolidated mode requires a 'platform' column in your file. Please download the Consolidated Template.")
+
+    # --- Platform-specific Column Mapping ---
+    brand_col = 'myntra_brand' if 'myntra_brand' in cols else 'brand' if 'brand' in cols else None
+    cat_col = 'myntra_article_type' if 'myntra_article_type' in cols else 'article_type' if 'article_type' in cols else None
+    gen_col = 'myntra_gender' if 'myntra_gender' in cols else 'gender' if 'gender' in cols else None
+    
+    jio_cat_col = 'jiomart_category' if 'jiomart_category' in cols else 'category' if 'category' in cols else None
+    weight_col = 'product_weight_kg' if 'product_weight_kg' in cols else 'product_weight' if 'product_weight' in cols else None
+    zone_col = 'shipping_zone' if 'shipping_zone' in cols else None
+    lap('column mapping')
+
+    # --- 1. Extract Base Data (whole columns) ---
+    sku = df[sku_col_name].to_numpy(dtype=object).astype(str).astype(object)
+    mrp, mrp_failed = parse_float_column(df[mrp_col_name])
+    cost, cost_failed = parse_float_column(df[cost_col_name])
+    failed = mrp_failed | cost_failed | np.isnan(mrp) | np.isnan(cost) # Blank, or coerced by the load schema
+
+    keep = ~failed & ~((mrp <= 0) | (cost <= 0)) # Skip rows with invalid data
+
+    if mode == 'Check With Selling Price':
+        selling_price, selling_failed = parse_float_column(df[selling_price_col_name])
+        selling_failed |= np.isnan(selling_price)
+        failed |= keep & selling_failed
+        keep &= ~selling_failed
+
+    if failed.any():
+        if failed_skus is not None:
+            failed_skus.extend(sku[failed])
+        else:
+            warn(_failed_rows_message(sku[failed]))
+
+    if not keep.any():
+        return None
+
+    def categorical(col_name):
+        if not col_name:
+            return None
+        column = df[col_name]
+        if isinstance(column.dtype, pd.CategoricalDtype): # Typed by the load schema
+            return column.array[keep]
+        return pd.Categorical(column.to_numpy(dtype=object)[keep])
+
+    columns = {
+        'sku': sku[keep],
+        'mrp': mrp[keep],
+        'cost': cost[keep],
+        'passthrough': {name: df[col].to_numpy()[keep] for col, name in (passthrough or {}).items()},
+    }
+    n = len(columns['sku'])
+    if mode == 'Check With Selling Price':
+        columns['selling_price'] = selling_price[keep]
+
+    # --- Determine platform per row ---
+    if bulk_platform == 'Consolidated':
+        platform = pd.Series(df[platform_col_name].to_numpy(dtype=object)[keep].astype(str)).str.strip()
+        columns['platform'] = pd.Categorical(platform)
+    else:
+        columns['platform'] = pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), [bulk_platform])
+    is_myntra = np.asarray(columns['platform'] == 'Myntra')
+
+    # --- 2. Extract Platform Data ---
+    columns['brand'] = categorical(brand_col)
+    columns['category'] = categorical(cat_col)
+    columns['gender'] = categorical(gen_col)
+
+    columns['jio_category'] = categorical(jio_cat_col)
+    columns['zone'] = _fill_missing(categorical(zone_col), 'Local') if zone_col else 'National' # Default; blank cells ship as Local
+    columns['weight'] = np.full(n, 0.5) # Default
+    if weight_col:
+        weight_val, weight_failed = parse_float_column(df[weight_col][keep])
+        if weight_col == 'product_weight': # Assume grams
+            weight_val = weight_val / 1000.0
+        columns['weight'] = np.where(weight_failed, 0.5, weight_val) # Default on error
+    lap('parsing')
+
+    # --- 3. Royalty Check ---
+    kuchipoo_royalty, other_portal_royalty = royalty_flags(columns['sku'], columns['brand'])
+    columns['kuchipoo_royalty'] = is_myntra & kuchipoo_royalty
+    columns['royalty'] = ~is_myntra & other_portal_royalty
+    lap('royalty classification')
+
+    return columns
+
+
+def _fill_missing(column, value):
+    # Categorical with missing values replaced by `value`
+    if column.isna().any():
+        if value not in column.categories:
+            column = column.add_categories([value])
+        column = column.fillna(value)
+    return column
+
+
+def _values(column):
+    # Engine input for a prepared column: Categoricals become object arrays
+    return np.asarray(column, dtype=object) if isinstance(column, pd.Categorical) else column
+
+
+# --- Identical pricing inputs (e.g. every size of a style) are priced once ---
+def _first_rows(groups):
+    # Group numbers are assigned in order of appearance, so a group starts where the running maximum rises
+    return np.flatnonzero(np.diff(np.maximum.accumulate(groups), prepend=-1) > 0)
+
+
+def pricing_input_groups(columns):
+    # (first row of each distinct input, group of every row), or (None, None) when
+    # too few rows repeat for deduplication to pay off. Rows are hashed on all engine
+    # inputs, and every row is checked against its group's first row, so a hash
+    # collision can never merge two different inputs.
+    parts = []
+    for name in PRICING_INPUT_COLUMNS:
+        column = columns.get(name)
+        if isinstance(column, pd.Categorical):
+            parts.append(column.codes)
+        elif isinstance(column, np.ndarray):
+            parts.append(column)
+    n = len(columns['mrp'])
+    if n < 2:
+        return None, None
+
+    hashed = pd.util.hash_array(parts[0])
+    for part in parts[1:]:
+        hashed = hashed * np.uint64(1_000_003) ^ pd.util.hash_array(part)
+    groups, uniques = pd.factorize(hashed)
+    if len(uniques) > DEDUPE_MAX_UNIQUE_SHARE * n:
+        return None, None
+    first = _first_rows(groups)
+
+    for part in parts:
+        representative = part[first[groups]]
+        same = part == representative
+        if part.dtype.kind == 'f':
+            same |= np.isnan(part) & np.isnan(representative)
+        if not same.all(): # Hash collision: fall back to an exact grouping
+            frame = pd.DataFrame(dict(enumerate(parts)))
+            groups = frame.groupby(list(frame.columns), sort=False, dropna=False).ngroup().to_numpy()
+            first = _first_rows(groups)
+            break
+    return first, groups
+
+
+def compute_bulk_columns(columns, mode, target_margin=0.0, meesho_charge=0.0, jio_benefit=0.0, rate_card=None):
+    # Engine stage for one block of prepared columns; returns the result columns.
+    first, groups = pricing_input_groups(columns)
+    if first is None:
+        return _compute_bulk_columns(columns, mode, target_margin, meesho_charge, jio_benefit, rate_card)
+    unique = _compute_bulk_columns(_take_shard(columns, first), mode, target_margin, meesho_charge, jio_benefit, rate_card)
+    return {name: values[groups] for name, values in unique.items()}
+
+
+def _compute_bulk_columns(columns, mode, target_margin=0.0, meesho_charge=0.0, jio_benefit=0.0, rate_card=None):
+    args = (
+        _values(columns['platform']),
+        _values(columns['brand']), _values(columns['category']), _values(columns['gender']), columns['kuchipoo_royalty'],
+        columns['weight'], _values(columns['zone']), _values(columns['jio_category']), jio_benefit,
+        meesho_charge,
+    )
+
+    if mode == 'Check With Selling Price':
+        mrp, selling_price = columns['mrp'], columns['selling_price']
+        results = perform_calculations_columnar(
+            mrp, mrp - selling_price, columns['cost'], *args,
+            selling_price, # For Meesho, WDP is the selling price
+            columns['royalty'],
+            fields=('settled_amount', 'net_profit', 'royalty_fee'), rate_card=rate_card
+        )
+        return {
+            "Final_Settled_Amount": results['settled_amount'] - results['royalty_fee'],
+            "Net_Profit": results['net_profit'] - results['royalty_fee'],
+        }
+
+    # Check With Cost Price: unreachable targets are flagged, the price columns stay numeric
+    solved = find_discount_for_target_profit_columnar(
+        columns['mrp'], target_margin, columns['cost'], *args,
+        columns['royalty'], rate_card=rate_card
+    )
+    return {
+        "Target_Achievable": solved['feasible'],
+        "Required_Selling_Price": columns['mrp'] - solved['discount_amount'],
+        "Required_Discount_Amount": solved['discount_amount'],
+        "Required_Discount_Percent": solved['discount_percent'],
+        "Net_Profit_at_Target": solved['net_profit'],
+    }
+
+
+# --- Parallel mode ---
+def _shard_positions(columns, chunk_size, shard_by):
+    n = len(columns['mrp'])
+    if shard_by == 'platform':
+        codes = columns['platform'].codes
+        shards = []
+        for code in np.unique(codes):
+            positions = np.flatnonzero(codes == code)
+            shards += [positions[start:start + chunk_size] for start in range(0, len(positions), chunk_size)]
+        return shards
+    return [slice(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+
+
+def _take_shard(columns, positions):
+    # SKU strings and passthrough columns stay in the parent; workers only need numbers, flags and category codes
+    return {name: column[positions] if isinstance(column, (np.ndarray, pd.Categorical)) else column
+            for name, column in columns.items() if name not in ('sku', 'passthrough')}
+
+
+def _compute_in_pool(columns, params, workers, chunk_size, shard_by):
+    shards = _shard_positions(columns, chunk_size, shard_by)
+    payloads = (_take_shard(columns, positions) for positions in shards)
+    context = multiprocessing.get_context('spawn') # Safe inside Streamlit's threaded server
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        parts = list(pool.map(compute_bulk_columns, payloads, *(repeat(value) for value in params)))
+    return _merge_parts(len(columns['mrp']), shards, parts)
+
+
+def _merge_parts(n, shards, parts):
+    # Result columns of each shard, back in input order
+    merged = {name: np.empty(n, dtype=values.dtype) for name, values in parts[0].items()}
+    for positions, part in zip(shards, parts):
+        for name, values in part.items():
+            merged[name][positions] = values
+    return merged
+
+
+# --- Pricing by order date: each row gets the rate card in effect on its order_date ---
+def _select_rows(columns, mask):
+    # Every prepared column (SKUs and passthrough included) for the rows in `mask`
+    selected = {name: column[mask] if isinstance(column, (np.ndarray, pd.Categorical)) else column
+                for name, column in columns.items() if name != 'passthrough'}
+    selected['passthrough'] = {name: values[mask] for name, values in columns['passthrough'].items()}
+    return selected
+
+
+def _rate_card_codes(columns, rate_history, warn):
+    # (columns, card code per row); rows dated outside every card are dropped with a warning
+    codes = rate_history.codes(columns['passthrough']['Order_Date'])
+    undated = codes < 0
+    if undated.any():
+        skus = columns['sku'][undated]
+        warn(f"{len(skus)} SKU(s) have no rate card for their order_date and were skipped: {', '.join(skus[:10])}"
+             + (" ..." if len(skus) > 10 else ""))
+        if undated.all():
+            return None, None
+        columns, codes = _select_rows(columns, ~undated), codes[~undated]
+    return columns, codes
+
+
+def _compute_by_rate_card(columns, codes, cards, compute):
+    # One engine pass per rate-card version present, each over all of that version's rows
+    present = np.unique(codes)
+    if len(present) == 1:
+        return compute(columns, cards[present[0]])
+    shards = [np.flatnonzero(codes == code) for code in present]
+    parts = [compute(_take_shard(columns, positions), cards[code]) for code, positions in zip(present, shards)]
+    return _merge_parts(len(columns['mrp']), shards, parts)
+
+
+# --- Helper function for bulk processing ---
+def run_bulk_processing(df, bulk_platform, mode, target_margin=0.0, meesho_charge=0.0, jio_benefit=0.0,
+                        workers=1, chunk_size=DEFAULT_CHUNK_SIZE, shard_by='rows', on_warning=None,
+                        profiler=None, passthrough=None, rate_card=None, rate_history=None, _failed_skus=None):
+    # rate_history: a RateCardHistory; each row is then priced with the card in effect on its
+    # order_date (kept in the output as Order_Date, with the version used as Rate_Card)
+    lap = profiler.lap if profiler else _no_lap
+    lap()
+    if rate_history is not None:
+        if ORDER_DATE_COLUMN not in df.columns:
+            raise BulkInputError(f"Pricing by order date needs an '{ORDER_DATE_COLUMN}' column in your file.")
+        passthrough = {ORDER_DATE_COLUMN: 'Order_Date', **(passthrough or {})}
+    columns = prepare_bulk_columns(df, bulk_platform, mode, on_warning, _failed_skus, profiler, passthrough)
+    if columns is None:
+        return pd.DataFrame()
+
+    workers = min(workers or 1, os.cpu_count() or 1) # More processes than cores only adds overhead
+    compute_stage = 'fee computation' if mode == 'Check With Selling Price' else 'target solving'
+
+    def compute(block, card):
+        # The card goes with the parameters so pool workers price with it, not with their own default
+        params = (mode, target_margin, meesho_charge, jio_benefit, card)
+        if workers > 1 and len(block['mrp']) > chunk_size:
+            pooled.append(True)
+            return _compute_in_pool(block, params, workers, chunk_size, shard_by)
+        return compute_bulk_columns(block, *params)
+    pooled = []
+
+    if rate_history is not None:
+        warn = on_warning or (lambda message: warnings.warn(message, stacklevel=2))
+        columns, codes = _rate_card_codes(columns, rate_history, warn)
+        if columns is None:
+            return pd.DataFrame()
+        lap('rate card lookup')
+        computed = {"Rate_Card": pd.Categorical.from_codes(codes, rate_history.versions)}
+        computed.update(_compute_by_rate_card(columns, codes, rate_history.cards, compute))
+    else:
+        computed = compute(columns, rate_card or active_rate_card())
+    lap(f"{compute_stage} ({workers} processes)" if pooled else compute_stage)
+
+    return _assemble_results(columns, computed, bulk_platform, mode, target_margin, lap)
+
+
+def _assemble_results(columns, computed, bulk_platform, mode, target_margin, lap):
+    output_data = {
+        "SKU": columns['sku'],
+        "MRP": columns['mrp'],
+        "Cost_Price": columns['cost'],
+    }
+    if bulk_platform == 'Consolidated':
+        output_data["Platform"] = np.asarray(columns['platform'], dtype=object)
+    if mode == 'Check With Selling Price':
+        output_data["Selling_Price"] = columns['selling_price']
+    else:
+        output_data["Target_Margin"] = np.full(len(columns['sku']), target_margin)
+    output_data.update(columns['passthrough'])
+    output_data.update(computed)
+
+    results = pd.DataFrame(output_data)
+    lap('output assembly')
+    return results
+
+
+# --- Incremental bulk pipeline: each stage is cached on the inputs it reads ---
+# Parsing runs once per (file, platform, mode). Fees / solving run per platform group and
+# are keyed only on the parameters that group reads, so changing the Jiomart benefit rate
+# recomputes Jiomart rows alone, and in selling-price mode only their cap and payout.
+# Priced stages are also keyed on the rate card's digest, so a new card reprices everything.
+class BulkPipeline:
+    def __init__(self, df, bulk_platform, mode, on_warning=None):
+        self.df = df
+        self.bulk_platform = bulk_platform
+        self.mode = mode
+        self.on_warning = on_warning
+        self.failed_skus = []
+        self._groups = None
+        self._stages = {} # stage -> (key, value); only the latest key is kept
+
+    def _stage(self, name, key, compute):
+        cached = self._stages.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = compute()
+        self._stages[name] = (key, value)
+        return value
+
+    def _group_key(self, platform, target_margin, meesho_charge, jio_benefit, card):
+        key = (card.digest,) if self.mode == 'Check With Selling Price' else (card.digest, target_margin)
+        if platform == 'Meesho':
+            key += (meesho_charge,)
+        elif platform == 'Jiomart':
+            key += (jio_benefit,)
+        return key
+
+    def _jiomart_payout(self, group, jio_benefit, card):
+        # Selling-price mode: everything but the fee cap is benefit-independent and cached
+        def fee_base():
+            mrp, selling_price = group['mrp'], group['selling_price']
+            return perform_calculations_columnar(
+                mrp, mrp - selling_price, group['cost'], 'Jiomart',
+                weight_in_kg=group['weight'], shipping_zone=_values(group['zone']), jiomart_category=_values(group['jio_category']),
+                wrong_defective_price=selling_price, apply_royalty=group['royalty'],
+                fields=('sale_price', 'customer_paid_amount', 'tds', 'tcs', 'jiomart_total_fee_base', 'royalty_fee'),
+                rate_card=card
+            )
+
+        base = self._stage('Jiomart fee base', (card.digest,), fee_base)
+        cpa = base['customer_paid_amount']
+        final_fee_base, gst_on_fees, _ = jiomart_fee_cap_array(cpa, base['jiomart_total_fee_base'], jio_benefit, card)
+        settled_amount = cpa - (final_fee_base + gst_on_fees) - base['tds'] - base['tcs']
+        net_profit = np.where(base['sale_price'] < 0, -99999999.0, settled_amount - group['cost'])
+        return {
+            "Final_Settled_Amount": settled_amount - base['royalty_fee'],
+            "Net_Profit": net_profit - base['royalty_fee'],
+        }
+
+    def columns(self, profiler=None):
+        return self._stage('columns', (), lambda: prepare_bulk_columns(
+            self.df, self.bulk_platform, self.mode, failed_skus=self.failed_skus, profiler=profiler
+        ))
+
+    def run(self, target_margin=0.0, meesho_charge=0.0, jio_benefit=0.0, profiler=None, rate_card=None):
+        warn = self.on_warning or (lambda message: warnings.warn(message, stacklevel=2))
+        card = rate_card or active_rate_card()
+        lap = profiler.lap if profiler else _no_lap
+        lap()
+        columns = self.columns(profiler)
+        if self.failed_skus: # Repeated on every run, like a fresh run_bulk_processing
+            warn(_failed_rows_message(self.failed_skus))
+        if columns is None:
+            return pd.DataFrame()
+        if self._groups is None:
+            platform = columns['platform']
+            self._groups = {name: np.flatnonzero(platform.codes == code) for code, name in enumerate(platform.categories)}
+
+        computed = {}
+        for platform, positions in self._groups.items():
+            if not len(positions):
+                continue
+            group = self._stage(f"{platform} columns", (), lambda: _take_shard(columns, positions))
+            if platform == 'Jiomart' and self.mode == 'Check With Selling Price':
+                part = self._jiomart_payout(group, jio_benefit, card)
+            else:
+                part = self._stage(
+                    f"{platform} results", self._group_key(platform, target_margin, meesho_charge, jio_benefit, card),
+                    lambda: compute_bulk_columns(group, self.mode, target_margin, meesho_charge, jio_benefit, card)
+                )
+            for name, values in part.items():
+                if name not in computed:
+                    computed[name] = np.empty(len(columns['mrp']), dtype=values.dtype)
+                computed[name][positions] = values
+        lap('fee computation' if self.mode == 'Check With Selling Price' else 'target solving')
+
+        return _assemble_results(columns, computed, self.bulk_platform, self.mode, target_margin, lap)
+
+
+# --- Streaming mode: price an upload chunk by chunk straight into a CSV ---
+def stream_bulk_processing(chunks, output, bulk_platform, mode, target_margin=0.0, meesho_charge=0.0,
+                           jio_benefit=0.0, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, shard_by='rows',
+                           on_warning=None, on_progress=None, profiler=None, passthrough=None, rate_history=None):
+    # chunks: iterable of raw upload DataFrames; output: path or binary file (written as CSV),
+    # or a ResultsWriter for other formats, which the caller closes.
+    # Only one input chunk and its results are held at a time. Returns the rows written.
+    warn = on_warning or (lambda message: warnings.warn(message, stacklevel=2))
+    failed_skus = []
+    rows_read = rows_written = 0
+    writer = output if isinstance(output, ResultsWriter) else ResultsWriter(output, 'csv')
+    lap = profiler.lap if profiler else _no_lap
+    lap()
+    for chunk in chunks:
+        lap('reading chunks')
+        rows_read += len(chunk)
+        results = run_bulk_processing(
+            chunk, bulk_platform, mode, target_margin, meesho_charge, jio_benefit,
+            workers, chunk_size, shard_by, on_warning, profiler, passthrough,
+            rate_history=rate_history, _failed_skus=failed_skus
+        )
+        if not results.empty:
+            writer.write(results)
+            rows_written += len(results)
+        lap('writing results')
+        if on_progress:
+            on_progress(rows_read, rows_written)
+
+    if writer is not output:
+        writer.close()
+    if failed_skus:
+        warn(_failed_rows_message(failed_skus))
+    return rows_written
+
+
+# --- Cross-platform comparison: every SKU priced on every channel in one pass ---
+CHANNELS = ('Myntra', 'FirstCry', 'Ajio', 'Jiomart', 'Meesho', 'Snapdeal')
+
+
+def run_channel_comparison(df, channels=CHANNELS, meesho_charge=0.0, jio_benefit=0.0, on_warning=None, profiler=None,
+                           rate_card=None):
+    # Net profit at the file's selling_price on each channel, plus the best channel per SKU.
+    # No 'platform' column is needed; one is ignored if present.
+    lap = profiler.lap if profiler else _no_lap
+    lap()
+    columns = prepare_bulk_columns(df, channels[0], 'Check With Selling Price', on_warning, profiler=profiler)
+    if columns is None:
+        return pd.DataFrame()
+    kuchipoo_royalty, other_portal_royalty = royalty_flags(columns['sku'], columns['brand'])
+    columns.update(kuchipoo_royalty=kuchipoo_royalty, royalty=other_portal_royalty) # Per-channel flags, as keys for dedupe
+
+    first, groups = pricing_input_groups(columns)
+    unique = columns if first is None else _take_shard(columns, first)
+    mrp, selling_price = unique['mrp'], unique['selling_price']
+    priced = perform_calculations_channels(
+        mrp, mrp - selling_price, unique['cost'], channels,
+        _values(unique['brand']), _values(unique['category']), _values(unique['gender']), unique['kuchipoo_royalty'],
+        unique['weight'], _values(unique['zone']), _values(unique['jio_category']), jio_benefit,
+        meesho_charge,
+        selling_price, # For Meesho, WDP is the selling price
+        unique['royalty'],
+        fields=('net_profit', 'royalty_fee'), rate_card=rate_card
+    )
+    profit = np.column_stack([priced[name]['net_profit'] - priced[name]['royalty_fee'] for name in channels])
+    if first is not None:
+        profit = profit[groups]
+    lap('fee computation (all channels)')
+
+    mrp, selling_price = columns['mrp'], columns['selling_price']
+    best = profit.argmax(axis=1)
+    output_data = {
+        "SKU": columns['sku'],
+        "MRP": mrp,
+        "Cost_Price": columns['cost'],
+        "Selling_Price": selling_price,
+    }
+    output_data.update({f"{name}_Net_Profit": profit[:, i] for i, name in enumerate(channels)})
+    output_data["Best_Channel"] = pd.Categorical.from_codes(best, channels)
+    output_data["Best_Net_Profit"] = profit[np.arange(len(best)), best]
+
+    results = pd.DataFrame(output_data)
+    lap('output assembly')
+    return results
+
+
+# --- Myntra discount sheets (mrp / sku code / discount, like sku.txt) joined to the SKU catalog ---
+DISCOUNT_SHEET_COLUMNS = ('mrp', 'sku_code', 'discount')
+_CATALOG_PRICE_COLUMNS = ('seller_sku_code', 'sku_code', 'product_mrp', 'mrp', 'product_mrp_', 'selling_price', 'discount')
+
+
+def _unmatched_message(skus):
+    return f"{len(skus)} SKU(s) in the discount sheet were not found in the SKU file: {', '.join(skus[:10])}" + (" ..." if len(skus) > 10 else "")
+
+
+def join_discount_sheet(sheet, catalog, sku_index, unmatched=None):
+    # Hash join on SKU; the sheet supplies MRP and discount, the catalog cost and attributes.
+    # Returns a frame in the bulk layout (selling_price = mrp - discount) for matched rows only.
+    missing = [col for col in DISCOUNT_SHEET_COLUMNS if col not in sheet.columns]
+    if missing:
+        raise BulkInputError(f"Discount sheet missing required column(s): {', '.join(missing)}. Expected 'mrp', 'sku code' and 'discount'.")
+    if sku_index is None:
+        raise BulkInputError("The SKU file has no SKU column ('seller_sku_code' or 'sku_code') to match the discount sheet against.")
+
+    positions = sku_positions(sku_index, sheet['sku_code'])
+    matched = positions >= 0
+    if unmatched is not None and not matched.all():
+        unmatched.extend(sheet['sku_code'].to_numpy(dtype=object)[~matched].astype(str))
+
+    joined = catalog.drop(columns=[col for col in _CATALOG_PRICE_COLUMNS if col in catalog.columns])
+    joined = joined.take(positions[matched]).reset_index(drop=True)
+    mrp = sheet['mrp'].to_numpy()[matched]
+    discount = sheet['discount'].to_numpy()[matched]
+    joined['seller_sku_code'] = sheet['sku_code'].to_numpy(dtype=object)[matched]
+    joined['product_mrp'] = mrp
+    joined['discount'] = discount
+    joined['selling_price'] = mrp - discount
+    return joined
+
+
+def run_discount_sheet_processing(sheet, catalog, sku_index, bulk_platform='Myntra', meesho_charge=0.0, jio_benefit=0.0,
+                                  workers=1, chunk_size=DEFAULT_CHUNK_SIZE, on_warning=None, profiler=None):
+    # Settlement and profit for every sheet row at its discount, in one vectorized pass
+    warn = on_warning or (lambda message: warnings.warn(message, stacklevel=2))
+    unmatched = []
+    joined = join_discount_sheet(sheet, catalog, sku_index, unmatched)
+    if unmatched:
+        warn(_unmatched_message(unmatched))
+    if joined.empty:
+        return pd.DataFrame()
+    return run_bulk_processing(
+        joined, bulk_platform, 'Check With Selling Price', 0.0, meesho_charge, jio_benefit,
+        workers, chunk_size, on_warning=on_warning, profiler=profiler, passthrough={'discount': 'Discount'}
+    )
+
+
+def stream_discount_sheet_processing(chunks, output, catalog, sku_index, bulk_platform='Myntra', meesho_charge=0.0,
+                                     jio_benefit=0.0, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, on_warning=None,
+                                     on_progress=None, profiler=None):
+    # Streaming counterpart for sheets too large to load; the catalog stays in memory
+    warn = on_warning or (lambda message: warnings.warn(message, stacklevel=2))
+    unmatched = []
+    rows_written = stream_bulk_processing(
+        (join_discount_sheet(chunk, catalog, sku_index, unmatched) for chunk in chunks), output,
+        bulk_platform, 'Check With Selling Price', 0.0, meesho_charge, jio_benefit, workers, chunk_size,
+        on_warning=on_warning, on_progress=on_progress, profiler=profiler, passthrough={'discount': 'Discount'}
+    )
+    if unmatched:
+        warn(_unmatched_message(unmatched))
+    return rows_written
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+from .ingest import read_sku_file
+
+
+CACHE_FORMAT_VERSION = 2 # Bump whenever read_sku_file starts producing different frames
+DEFAULT_CACHE_DIR = os.environ.get('VARDHMAN_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'vardhman_pricing_cache'))
+DEFAULT_CACHE_MAX_MB = float(os.environ.get('VARDHMAN_CACHE_MAX_MB', 1024))
+
+
+def file_digest(file, name):
+    # Hash of the raw upload bytes plus the file kind and cache format
+    digest = hashlib.sha256(f"{CACHE_FORMAT_VERSION}:{os.path.splitext(name)[1].lower()}:".encode())
+    if hasattr(file, 'getbuffer'):
+        digest.update(file.getbuffer())
+    else:
+        file.seek(0)
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+        file.seek(0)
+    return digest.hexdigest()
+
+
+# --- On-disk Parquet cache of parsed SKU frames, evicted least-recently-used by total size ---
+class FrameCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_mb=DEFAULT_CACHE_MAX_MB):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.parquet', base + '.json'
+
+    def get(self, key):
+        # Returns (frame, meta) or None
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            try:
+                df = pd.read_parquet(data_path)
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                return None
+            for path in (data_path, meta_path):
+                os.utime(path) # Mark as recently used
+        return df, meta
+
+    def put(self, key, df, meta=None):
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            # Write under temporary names first so readers never see a partial entry
+            df.to_parquet(data_path + '.tmp', index=False)
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump(meta or {}, f)
+            os.replace(data_path + '.tmp', data_path)
+            os.replace(meta_path + '.tmp', meta_path)
+            self._evict(keep=key)
+
+    def _evict(self, keep):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.parquet'):
+                key = entry.name[:-len('.parquet')]
+                size = entry.stat().st_size
+                meta_path = self._paths(key)[1]
+                if os.path.exists(meta_path):
+                    size += os.path.getsize(meta_path)
+                entries.append((entry.stat().st_mtime, key, size))
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def size_bytes(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def clear(self):
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.is_file():
+                    os.remove(entry.path)
+
+
+def read_sku_file_cached(file, name, cache, coerced=None):
+    # read_sku_file, served from the cache when identical bytes were parsed before.
+    # Returns (frame, cache_hit).
+    key = file_digest(file, name)
+    cached = cache.get(key)
+    if cached is not None:
+        df, meta = cached
+        if coerced is not None:
+            for col, labels in meta.get('coerced', {}).items():
+                coerced.setdefault(col, []).extend(labels)
+        return df, True
+
+    file_coerced = {}
+    df = read_sku_file(file, name, file_coerced)
+    try:
+        cache.put(key, df, {'name': name, 'coerced': file_coerced})
+    except (OSError, ValueError, TypeError, NotImplementedError):
+        pass # Caching is best effort; e.g. duplicate column names cannot be stored as Parquet
+    if coerced is not None:
+        for col, labels in file_coerced.items():
+            coerced.setdefault(col, []).extend(labels)
+    return df, False
@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .ingest import SKU_COLUMNS
+
+
+SKU_SEARCH_LIMIT = 50 # Matches returned per search
+
+# --- Lower-cased SKU -> row position, built once per upload ---
+# duplicates maps each repeated key to all of its row positions (the first one wins on lookup);
+# sorted_keys / sorted_labels are the unique keys in order, with their original spelling, for prefix search;
+# keys / key_positions are the same mapping as positions, as a pd.Index and array for sku_positions' joins
+SkuIndex = namedtuple('SkuIndex', ['column', 'positions', 'duplicates', 'sorted_keys', 'sorted_labels', 'keys', 'key_positions'])
+
+
+def find_sku_column(columns):
+    return next((col for col in SKU_COLUMNS if col in columns), None)
+
+
+def build_sku_index(df, sku_col=None):
+    sku_col = sku_col or find_sku_column(df.columns)
+    if not sku_col:
+        return None
+    skus = df[sku_col].reset_index(drop=True)
+    keys = skus.dropna().astype(str).str.strip().str.lower()
+    first = keys[~keys.duplicated(keep='first')]
+    positions = dict(zip(first.to_numpy(dtype=object), first.index.to_numpy()))
+
+    repeated = keys[keys.duplicated(keep=False)]
+    duplicates = {key: group.to_numpy() for key, group in repeated.index.to_series().groupby(repeated.to_numpy(), sort=False)}
+
+    order = np.argsort(first.to_numpy(dtype=object), kind='stable')
+    sorted_keys = first.to_numpy(dtype=object)[order]
+    sorted_labels = skus.astype(str).to_numpy(dtype=object)[first.index.to_numpy()[order]]
+    return SkuIndex(sku_col, positions, duplicates, sorted_keys, sorted_labels,
+                    pd.Index(first.to_numpy(dtype=object)), first.index.to_numpy(dtype=np.int64))
+
+
+def duplicate_sku_message(df, sku_index):
+    labels = [str(df[sku_index.column].iat[rows[0]]) for rows in sku_index.duplicates.values()]
+    extra_rows = sum(len(rows) - 1 for rows in sku_index.duplicates.values())
+    return (f"{len(labels)} SKU(s) appear more than once ({extra_rows} extra rows); the first row is used for 'Fetch by SKU': "
+            + ", ".join(labels[:10]) + (" ..." if len(labels) > 10 else ""))
+
+
+def sku_positions(sku_index, skus):
+    # Vectorized hash join: catalog row position for each SKU (same matching as lookup_sku_row), -1 if absent
+    skus = pd.Series(skus, dtype=object).reset_index(drop=True)
+    keys = skus.astype(str).str.strip().str.lower()
+    found = sku_index.keys.get_indexer(keys)
+    return np.where((found >= 0) & skus.notna().to_numpy(), sku_index.key_positions[found], -1)
+
+
+def lookup_sku_row(df, sku_index, sku):
+    position = sku_index.positions.get(str(sku).strip().lower())
+    return None if position is None else df.iloc[position]
+
+
+# --- Typeahead search: prefix matches from the sorted keys first, then substring matches ---
+def search_skus(sku_index, query, limit=SKU_SEARCH_LIMIT):
+    query = str(query).strip().lower()
+    keys = sku_index.sorted_keys
+    start = np.searchsorted(keys, query, side='left')
+    end = start + min(limit, np.searchsorted(keys, query + '\U0010ffff', side='right') - start)
+    matches = list(sku_index.sorted_labels[start:end])
+    if query and len(matches) < limit:
+        contains = np.array(pd.Series(keys, dtype=object).str.contains(query, regex=False), dtype=bool)
+        contains[start:end] = False # Already listed as prefix matches
+        matches += list(sku_index.sorted_labels[np.flatnonzero(contains)[:limit - len(matches)]])
+    return matches
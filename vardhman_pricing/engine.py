@@ -0,0 +1,1045 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from .rates import (
+    active_rate_card,
+    rate_card_codes,
+    rate_card_lookup,
+    rate_card_rate,
+    slab_lookup,
+)
+
+
+# --- (CHANGED) Rates come from a RateCard: the active one unless rate_card is given ---
+def get_myntra_new_commission_rate(brand, category, gender, seller_price, rate_card=None):
+    card = rate_card or active_rate_card()
+    try:
+        return rate_card_rate(card.myntra_commission, (brand, category, gender), seller_price)
+    except Exception:
+        return 0.0
+
+def calculate_myntra_new_fixed_fee(brand, taxable_value_for_slab, rate_card=None):
+    card = rate_card or active_rate_card()
+    base_fee = float(slab_lookup(card.myntra_fixed_fee, taxable_value_for_slab))
+    
+    gst_on_fee = base_fee * card.fee_gst_rate
+    final_fee = base_fee + gst_on_fee
+            
+    return final_fee 
+
+def calculate_myntra_new_royalty(brand, sale_price, apply_kuchipoo_royalty_flag, rate_card=None):
+    card = rate_card or active_rate_card()
+    royalty_rate = card.myntra_royalty_rates.get(brand, 0.0)
+    if apply_kuchipoo_royalty_flag == 'Yes':
+        royalty_rate = card.myntra_flagged_royalty_rates.get(brand, royalty_rate)
+        
+    return sale_price * royalty_rate
+
+def calculate_myntra_yk_fixed_fee(brand, taxable_value_for_slab, rate_card=None):
+    card = rate_card or active_rate_card()
+    if brand not in card.yk_brands:
+        return 0.0 
+
+    base_fee = float(slab_lookup(card.myntra_yk_fixed_fee, taxable_value_for_slab))
+    
+    gst_on_fee = base_fee * card.fee_gst_rate
+    final_fee = base_fee + gst_on_fee
+            
+    return final_fee
+
+def calculate_jiomart_fixed_fee_base(sale_price, rate_card=None):
+    card = rate_card or active_rate_card()
+    return float(slab_lookup(card.jiomart_fixed_fee, sale_price))
+
+def calculate_jiomart_shipping_fee_base(weight_in_kg, shipping_zone, rate_card=None):
+    card = rate_card or active_rate_card()
+    first, nxt, upto_5kg, after_5kg = card.jiomart_shipping_rates[card.jiomart_shipping_zone_codes.get(shipping_zone, 0)].tolist()
+    if weight_in_kg <= 0.5:
+        return float(first)
+    if weight_in_kg <= 1.0:
+        return float(first + nxt)
+    remaining_weight = weight_in_kg - 1.0
+    if remaining_weight <= 4.0:
+        return float((first + nxt) + math.ceil(remaining_weight) * upto_5kg)
+    return float((first + nxt) + 4 * upto_5kg + math.ceil(remaining_weight - 4.0) * after_5kg)
+
+def _ships(shipping_zone, weight_in_kg):
+    # Blank and missing (None / NaN) zones pay no shipping
+    return bool(shipping_zone) and shipping_zone == shipping_zone and weight_in_kg > 0
+
+def get_jiomart_commission_rate(product_category, sale_price, rate_card=None):
+    card = rate_card or active_rate_card()
+    return rate_card_rate(card.jiomart_commission, (product_category,), sale_price)
+
+def calculate_taxable_amount_value(customer_paid_amount):
+    if customer_paid_amount >= 2500:
+        tax_rate = 0.12
+        divisor = 1.12
+    else:
+        tax_rate = 0.05
+        divisor = 1.05
+    taxable_amount = customer_paid_amount / divisor
+    return taxable_amount, tax_rate
+
+# --- (NEW) Result record for perform_calculations ---
+# A namedtuple, so existing positional unpacking keeps working while callers
+# can read just the fields they need by name.
+CALCULATION_FIELDS = (
+    'sale_price', 'gt_charge', 'customer_paid_amount', 'royalty_fee',
+    'marketing_fee_base', 'marketing_fee_rate',
+    'final_commission',
+    'commission_rate', 'settled_amount', 'taxable_amount_value',
+    'net_profit', 'tds', 'tcs', 'invoice_tax_rate',
+    'jiomart_fixed_fee_base', 'jiomart_shipping_fee_base',
+    'jiomart_benefit_amount',
+    'jiomart_total_fee_base',
+    'jiomart_final_applicable_fee_base',
+    'jiomart_gst_on_fees',
+    'yk_fixed_fee',
+)
+
+CalculationResult = namedtuple('CalculationResult', CALCULATION_FIELDS)
+_EMPTY_RESULT = CalculationResult(*(0.0 for _ in CALCULATION_FIELDS))
+
+
+def calculation_dtype(fields=None):
+    fields = CALCULATION_FIELDS if fields is None else tuple(fields)
+    unknown = set(fields) - set(CALCULATION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown calculation fields: {sorted(unknown)}")
+    return np.dtype([(field, np.float64) for field in fields])
+
+
+def perform_calculations(mrp, discount, 
+                           product_cost, platform,
+                           myntra_new_brand=None, myntra_new_category=None, myntra_new_gender=None,
+                           apply_kuchipoo_royalty='No',
+                           weight_in_kg=0.0, shipping_zone=None, jiomart_category=None, jiomart_benefit_rate=0.0,
+                           meesho_charge_rate=0.0, wrong_defective_price=None,
+                           apply_royalty='No', marketing_fee_rate=0.0, rate_card=None):
+    card = rate_card or active_rate_card()
+
+    gt_charge = 0.0 
+    yk_fixed_fee = 0.0 
+    royalty_fee = 0.0
+    marketing_fee_base = 0.0 
+    final_commission = 0.0
+    commission_rate = 0.0
+    
+    jiomart_comm_fee_base = 0.0
+    jiomart_fixed_fee_base = 0.0
+    jiomart_shipping_fee_base = 0.0
+    jiomart_total_fee_base = 0.0
+    jiomart_benefit_amount = 0.0 
+    jiomart_final_applicable_fee_base = 0.0
+    jiomart_gst_on_fees = 0.0
+    total_platform_deduction = 0.0
+    
+    total_fixed_charge = 0.0 
+    GST_RATE_FEES = card.fee_gst_rate
+
+    if platform == 'Meesho':
+        if wrong_defective_price is not None and wrong_defective_price > 0:
+            customer_paid_amount = wrong_defective_price
+        else:
+            customer_paid_amount = mrp
+            
+        sale_price = customer_paid_amount
+        discount = mrp - sale_price 
+
+    else:
+        sale_price = mrp - discount 
+        
+        if sale_price < 0:
+            return _EMPTY_RESULT._replace(sale_price=sale_price, net_profit=-99999999.0)
+
+        customer_paid_amount = sale_price 
+
+    # --- (MOVED) COMMON TAX CALCULATION ---
+    taxable_amount_value, invoice_tax_rate = calculate_taxable_amount_value(customer_paid_amount)
+    tax_amount = customer_paid_amount - taxable_amount_value
+    tds = taxable_amount_value * 0.001
+    tcs = tax_amount * 0.10 
+    # --- (END MOVED BLOCK) ---
+
+    # --- PLATFORM SPECIFIC FEES ---
+    if platform == 'Meesho':
+        commission_rate = meesho_charge_rate
+        commission_base = customer_paid_amount * commission_rate
+        commission_tax = commission_base * GST_RATE_FEES
+        final_commission = commission_base + commission_tax
+        gt_charge = 0.0
+        yk_fixed_fee = 0.0
+        marketing_fee_base = 0.0
+        royalty_fee = customer_paid_amount * card.royalty_rate if apply_royalty == 'Yes' else 0.0 # --- (CHANGED) ---
+        total_fixed_charge = 0.0
+
+    elif platform == 'Myntra':
+        
+        gt_charge = calculate_myntra_new_fixed_fee(myntra_new_brand, taxable_amount_value, card) 
+        
+        yk_fixed_fee = calculate_myntra_yk_fixed_fee(myntra_new_brand, taxable_amount_value, card) 
+
+        total_fixed_charge = gt_charge + yk_fixed_fee 
+        
+        seller_price = customer_paid_amount - gt_charge # Use customer_paid_amount
+        
+        commission_rate = get_myntra_new_commission_rate(myntra_new_brand, myntra_new_category, myntra_new_gender, seller_price, card) 
+            
+        commission_base = seller_price * commission_rate
+        commission_tax = commission_base * GST_RATE_FEES
+        final_commission = commission_base + commission_tax
+        
+        royalty_fee = calculate_myntra_new_royalty(myntra_new_brand, customer_paid_amount, apply_kuchipoo_royalty, card) # Use customer_paid_amount
+        
+        # --- (NEW) Calculate Myntra Marketing Fee ---
+        if myntra_new_brand in card.myntra_marketing_fee_rates:
+            marketing_fee_base = customer_paid_amount * card.myntra_marketing_fee_rates[myntra_new_brand]
+        else:
+            marketing_fee_base = 0.0
+        # --- (END NEW) ---
+        
+        sale_price = seller_price # Override sale_price for return
+            
+            
+    elif platform == 'FirstCry':
+        commission_rate = card.firstcry_commission_rate
+        final_commission = customer_paid_amount * commission_rate # Use customer_paid_amount
+        gt_charge = 0.0
+        marketing_fee_base = 0.0
+        total_fixed_charge = 0.0
+        royalty_fee = customer_paid_amount * card.royalty_rate if apply_royalty == 'Yes' else 0.0 # Use customer_paid_amount
+
+    elif platform == 'Ajio':
+        commission_rate = card.ajio_commission_rate
+        commission_base = customer_paid_amount * commission_rate # Use customer_paid_amount
+        commission_tax = commission_base * GST_RATE_FEES
+        final_commission = commission_base + commission_tax
+        scm_base = card.ajio_scm_fee
+        scm_tax = scm_base * GST_RATE_FEES
+        gt_charge = scm_base + scm_tax
+        marketing_fee_base = 0.0
+        total_fixed_charge = gt_charge
+        royalty_fee = customer_paid_amount * card.royalty_rate if apply_royalty == 'Yes' else 0.0 # Use customer_paid_amount
+
+    elif platform == 'Snapdeal':
+        commission_rate = card.snapdeal_commission_rate
+        commission_base = round(customer_paid_amount * commission_rate) # Use customer_paid_amount
+        commission_tax = round(commission_base * GST_RATE_FEES)
+        final_commission = commission_base + commission_tax
+        
+        ro_base = round(customer_paid_amount * card.snapdeal_ro_fee_rate) # Use customer_paid_amount
+        ro_tax = round(ro_base * card.snapdeal_ro_fee_gst_rate)
+        gt_charge = ro_base + ro_tax
+            
+        marketing_fee_base = 0.0
+        total_fixed_charge = gt_charge
+        royalty_fee = customer_paid_amount * card.royalty_rate if apply_royalty == 'Yes' else 0.0 # Use customer_paid_amount
+
+    elif platform == 'Jiomart':
+        
+        commission_rate = get_jiomart_commission_rate(jiomart_category, customer_paid_amount, card) if jiomart_category else 0.0 
+        jiomart_comm_fee_base = customer_paid_amount * commission_rate 
+        jiomart_fixed_fee_base = calculate_jiomart_fixed_fee_base(customer_paid_amount, card) 
+        jiomart_shipping_fee_base = calculate_jiomart_shipping_fee_base(weight_in_kg, shipping_zone, card) if _ships(shipping_zone, weight_in_kg) else 0.0
+        
+        jiomart_total_fee_base = jiomart_comm_fee_base + jiomart_fixed_fee_base + jiomart_shipping_fee_base
+        
+        # --- (UPDATED LOGIC: MAX FEE CAP) ---
+        # Calculate the maximum fee allowed based on the input percentage
+        max_fee_allowed = customer_paid_amount * jiomart_benefit_rate
+        
+        # If the standard total fee is greater than the cap, use the cap.
+        if jiomart_total_fee_base > max_fee_allowed:
+            jiomart_final_applicable_fee_base = max_fee_allowed
+            # Benefit is the amount reduced from the total fee
+            # Stored as negative to match display style (-12.70)
+            jiomart_benefit_amount = -(jiomart_total_fee_base - max_fee_allowed)
+        else:
+            # If standard fee is less than the cap, just pay the standard fee
+            jiomart_final_applicable_fee_base = jiomart_total_fee_base
+            jiomart_benefit_amount = 0.0
+        # --- (END UPDATED LOGIC) ---
+            
+        jiomart_gst_on_fees = jiomart_final_applicable_fee_base * GST_RATE_FEES
+            
+        total_platform_deduction = jiomart_final_applicable_fee_base + jiomart_gst_on_fees
+        
+        final_commission = jiomart_comm_fee_base 
+        total_fixed_charge = jiomart_fixed_fee_base + jiomart_shipping_fee_base
+        gt_charge = total_fixed_charge 
+        
+        royalty_fee = customer_paid_amount * card.royalty_rate if apply_royalty == 'Yes' else 0.0 
+
+            
+    # tax_amount = customer_paid_amount - taxable_amount_value
+    # tds = taxable_amount_value * 0.001
+    # tcs = tax_amount * 0.10 
+
+    if platform == 'Jiomart':
+        total_deductions = total_platform_deduction 
+    elif platform == 'Myntra':
+         # --- (CHANGED) Added marketing_fee_base ---
+         total_deductions = final_commission + gt_charge + yk_fixed_fee + marketing_fee_base
+    elif platform == 'Meesho':
+        total_deductions = final_commission 
+    else: 
+        total_deductions = final_commission + marketing_fee_base + gt_charge
+        
+    settled_amount = customer_paid_amount - total_deductions - tds - tcs
+    net_profit = settled_amount - product_cost
+
+    return CalculationResult(sale_price, gt_charge, customer_paid_amount, royalty_fee,
+            marketing_fee_base, 0.0, 
+            final_commission, 
+            commission_rate, settled_amount, taxable_amount_value,
+            net_profit, tds, tcs, invoice_tax_rate, 
+            jiomart_fixed_fee_base, jiomart_shipping_fee_base,
+            jiomart_benefit_amount, 
+            jiomart_total_fee_base, 
+            jiomart_final_applicable_fee_base, 
+            jiomart_gst_on_fees, 
+            yk_fixed_fee 
+            )
+
+# --- (NEW) Breakpoints of the profit curve ---
+# Between two of these invoice values every fee is linear in the price, so
+# profit is a straight line and the target can be solved for directly.
+SNAPDEAL_ROUNDING_SLACK = 2.5 # Max gap between Snapdeal's rounded fees and the unrounded line
+
+
+def _snapdeal_rounding_slack(card):
+    # Each rounded fee and its rounded GST stray at most 0.5 + 0.5 * (1 + GST rate) from the line
+    return max(SNAPDEAL_ROUNDING_SLACK, 2.0 + 0.5 * (card.fee_gst_rate + card.snapdeal_ro_fee_gst_rate))
+
+
+def _target_profit_breakpoints(platform, myntra_new_brand=None, myntra_new_category=None, myntra_new_gender=None,
+                               weight_in_kg=0.0, shipping_zone=None, jiomart_category=None, jiomart_benefit_rate=0.0,
+                               card=None):
+    card = card or active_rate_card()
+    points = [2500.0] # Invoice tax slab
+
+    if platform == 'Myntra':
+        fixed_fee_bounds = np.union1d(card.myntra_fixed_fee['bounds'], card.myntra_yk_fixed_fee['bounds'])
+        for divisor, in_slab in ((1.05, lambda cpa: cpa < 2500), (1.12, lambda cpa: cpa >= 2500)):
+            for taxable_bound in fixed_fee_bounds:
+                if in_slab(taxable_bound * divisor):
+                    points.append(taxable_bound * divisor)
+        commission = card.myntra_commission
+        code = commission['codes'].get((myntra_new_brand, myntra_new_category, myntra_new_gender))
+        if code is not None:
+            commission_bounds = commission['bounds'][commission['schedule'][code]]
+            # Commission slabs apply to (invoice - GT charge), so shift by every GT level
+            for base_fee in card.myntra_fixed_fee['values']:
+                gt_charge = base_fee + base_fee * card.fee_gst_rate
+                for bound in commission_bounds:
+                    cpa = bound + gt_charge
+                    taxable_amount_value, _ = calculate_taxable_amount_value(cpa)
+                    if calculate_myntra_new_fixed_fee(myntra_new_brand, taxable_amount_value, card) == gt_charge:
+                        points.append(cpa)
+
+    elif platform == 'Jiomart':
+        points += list(card.jiomart_fixed_fee['bounds'])
+        rates = {0.0}
+        commission = card.jiomart_commission
+        code = commission['codes'].get((jiomart_category,)) if jiomart_category else None
+        if code is not None:
+            points += list(commission['bounds'][commission['schedule'][code]])
+            rates.update(commission['values'][code])
+        shipping = calculate_jiomart_shipping_fee_base(weight_in_kg, shipping_zone, card) if _ships(shipping_zone, weight_in_kg) else 0.0
+        # Where the fee cap (benefit rate) overtakes the standard fee
+        for rate in rates:
+            for fixed_fee in card.jiomart_fixed_fee['values']:
+                if jiomart_benefit_rate != rate:
+                    cpa = (fixed_fee + shipping) / (jiomart_benefit_rate - rate)
+                    if cpa > 0:
+                        points.append(cpa)
+
+    elif platform == 'Meesho':
+        points.append(0.0) # WDP of 0 falls back to MRP
+
+    return points
+
+
+def _snapdeal_rounding_breakpoints(cpa_low, cpa_high, card):
+    points = []
+    for rate in (card.snapdeal_commission_rate, card.snapdeal_ro_fee_rate): # Commission and RO fee are rounded to the rupee
+        j = int(np.floor(cpa_low * rate - 0.5))
+        while (j + 0.5) / rate <= cpa_high:
+            points.append((j + 0.5) / rate)
+            j += 1
+    return points
+
+
+def _first_failing_step(profit_at, target_profit, first_step, last_step, break_steps,
+                        slack=0.0, fine_break_steps=None):
+    # Smallest grid step in [first_step, last_step] whose profit is below target, or None.
+    # Steps next to a breakpoint are checked one by one; runs of steps in between are linear.
+    guards = {first_step, last_step}
+    for x in break_steps:
+        for k in range(int(np.floor(x - 1e-6)), int(np.floor(x + 1e-6)) + 2):
+            if first_step <= k <= last_step:
+                guards.add(k)
+
+    previous = None
+    for guard in sorted(guards):
+        if previous is not None and guard > previous + 1:
+            k = _first_failing_on_line(profit_at, target_profit, previous + 1, guard - 1, slack, fine_break_steps)
+            if k is not None:
+                return k
+        if profit_at(guard) < target_profit:
+            return guard
+        previous = guard
+    return None
+
+
+def _first_failing_on_line(profit_at, target_profit, low, high, slack, fine_break_steps):
+    profit_low = profit_at(low)
+    if profit_low < target_profit:
+        return low
+    profit_high = profit_at(high)
+
+    if slack:
+        # Rounded fees stay within `slack` of the line, so only the band where the
+        # line is near the target needs an exact walk over the rounding breakpoints.
+        if min(profit_low, profit_high) >= target_profit + 2 * slack:
+            return None
+        slope = (profit_high - profit_low) / (high - low)
+        band_low, band_high = low, high
+        if slope < 0:
+            band_low = max(low, int(np.floor(low + (profit_low - target_profit - 2 * slack) / -slope)) - 1)
+            band_high = min(high, int(np.ceil(low + (profit_low - target_profit + 2 * slack) / -slope)) + 1)
+        elif slope > 0:
+            band_high = min(high, int(np.ceil(low + (target_profit + 2 * slack - profit_low) / slope)) + 1)
+        return _first_failing_step(profit_at, target_profit, band_low, band_high,
+                                   fine_break_steps(band_low, band_high))
+
+    if profit_high >= target_profit:
+        return None
+    # Straight line: invert it, then settle the exact step with a couple of evaluations
+    k = low + (profit_low - target_profit) / (profit_low - profit_high) * (high - low)
+    k = min(max(int(np.floor(k)), low + 1), high)
+    while k > low + 1 and profit_at(k - 1) < target_profit:
+        k -= 1
+    while profit_at(k) >= target_profit:
+        k += 1
+    return k
+
+
+def find_discount_for_target_profit(mrp, target_profit, product_cost, platform,
+                                    myntra_new_brand=None, myntra_new_category=None, myntra_new_gender=None,
+                                    apply_kuchipoo_royalty='No',
+                                    weight_in_kg=0.0, shipping_zone=None, jiomart_category=None, jiomart_benefit_rate=0.0,
+                                    meesho_charge_rate=0.0, wrong_defective_price=None, 
+                                    apply_royalty='No', precision=1.0, rate_card=None):
+    card = rate_card or active_rate_card()
+
+    def get_profit(disc, wdp=None):
+        results = perform_calculations(mrp, disc, product_cost, platform,
+                                       myntra_new_brand, myntra_new_category, myntra_new_gender,
+                                       apply_kuchipoo_royalty,
+                                       weight_in_kg, shipping_zone, jiomart_category, jiomart_benefit_rate,
+                                       meesho_charge_rate, wdp,
+                                       apply_royalty, 0.0, card) 
+        
+        # --- (FIX) Add check for NoneType ---
+        net_profit_before_royalty = results.net_profit if results.net_profit is not None else 0.0
+        royalty_fee_for_profit = results.royalty_fee if results.royalty_fee is not None else 0.0
+        # --- (END FIX) ---
+        
+        return net_profit_before_royalty - royalty_fee_for_profit
+
+    # --- (NEW) Discount grid: whole rupees by default, precision=0.01 for paise ---
+    def discount_at(step):
+        return round(step * precision, 2)
+
+    profit_cache = {}
+    def profit_at(step):
+        if step not in profit_cache:
+            if platform == 'Meesho':
+                profit_cache[step] = get_profit(0.0, round(mrp - discount_at(step), 2))
+            else:
+                profit_cache[step] = get_profit(discount_at(step))
+        return profit_cache[step]
+
+    initial_profit = profit_at(0)
+    if initial_profit < target_profit:
+        return None, initial_profit, 0.0 
+
+    last_step = int(np.floor(mrp / precision + 1e-9))
+    while last_step >= 0 and discount_at(last_step) > mrp:
+        last_step -= 1
+
+    def to_step(cpa):
+        return (mrp - cpa) / precision
+
+    break_steps = [to_step(cpa) for cpa in _target_profit_breakpoints(
+        platform, myntra_new_brand, myntra_new_category, myntra_new_gender,
+        weight_in_kg, shipping_zone, jiomart_category, jiomart_benefit_rate, card)]
+
+    if platform == 'Snapdeal':
+        slack = _snapdeal_rounding_slack(card)
+        def fine_break_steps(low, high):
+            return [to_step(cpa) for cpa in _snapdeal_rounding_breakpoints(mrp - discount_at(high), mrp - discount_at(low), card)]
+    else:
+        slack, fine_break_steps = 0.0, None
+
+    failing_step = None
+    if last_step >= 0:
+        failing_step = _first_failing_step(profit_at, target_profit, 0, last_step, break_steps, slack, fine_break_steps)
+
+    if platform == 'Meesho':
+        if failing_step is None:
+            final_profit = get_profit(0.0, 0.0)
+            return mrp, final_profit, 100.0
+        failing_wdp = mrp - discount_at(failing_step)
+        target_wdp = min(failing_wdp + precision, mrp)
+        discount_amount = mrp - target_wdp
+        discount_percent = (discount_amount / mrp) * 100 if mrp > 0 else 0.0
+        final_profit = get_profit(0.0, target_wdp)
+        return discount_amount, final_profit, discount_percent
+
+    if failing_step is None:
+        final_profit = get_profit(mrp)
+        return mrp, final_profit, 100.0
+
+    final_discount = max(0.0, discount_at(failing_step - 1))
+    final_profit = get_profit(final_discount)
+    discount_percent = (final_discount / mrp) * 100
+    return final_discount, final_profit, discount_percent
+
+
+# ==============================================================================
+# --- (NEW) COLUMNAR ENGINE FOR BULK PROCESSING ---
+# ==============================================================================
+# Same maths as perform_calculations, but every argument can be a whole column.
+def _float_column(values, n, default=np.nan):
+    if values is None:
+        return np.full(n, default, dtype=float)
+    return np.broadcast_to(np.asarray(values, dtype=float), (n,))
+
+
+def _object_column(values, n):
+    if values is None or np.ndim(values) == 0:
+        column = np.empty(n, dtype=object)
+        column[:] = values
+        return column
+    return np.asarray(values, dtype=object)
+
+
+def _bool_column(values, n):
+    if values is None:
+        return np.zeros(n, dtype=bool)
+    if np.ndim(values) == 0:
+        return np.full(n, values == 'Yes' or values is True, dtype=bool)
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    return values == 'Yes'
+
+
+# --- (NEW) Jiomart fee stages for whole columns ---
+def jiomart_shipping_zone_codes(shipping_zone, rate_card=None):
+    # Row of the card's shipping rates per zone name: unknown zones are charged as the
+    # first zone (Local), blank ('') and missing ones get -1 and pay no shipping
+    import pandas as pd
+
+    zone_codes = (rate_card or active_rate_card()).jiomart_shipping_zone_codes
+    codes, zones = pd.factorize(np.asarray(shipping_zone, dtype=object))
+    table = np.array([-1 if zone == '' else zone_codes.get(zone, 0) for zone in zones] + [-1], dtype=np.intp)
+    return table[codes] # Missing values (code -1) pick the trailing -1
+
+
+def _zone_code_column(values, n, card):
+    # shipping_zone as zone codes; integer arrays are taken as codes already
+    if values is not None and np.ndim(values) and np.asarray(values).dtype.kind in 'iu':
+        return np.asarray(values)
+    return jiomart_shipping_zone_codes(_object_column('' if values is None else values, n), card)
+
+
+def jiomart_shipping_fee_array(weight_in_kg, zone_codes, rate_card=None):
+    # Slab-based shipping fee base in one pass; nothing without a zone or a positive weight
+    rates = (rate_card or active_rate_card()).jiomart_shipping_rates
+    first, nxt, upto_5kg, after_5kg = rates[np.maximum(zone_codes, 0)].T
+    remaining = weight_in_kg - 1.0
+    fees = np.select(
+        [weight_in_kg <= 0.5, weight_in_kg <= 1.0, remaining <= 4.0],
+        [first,
+         first + nxt,
+         (first + nxt) + np.ceil(remaining) * upto_5kg],
+        (first + nxt) + 4 * upto_5kg + np.ceil(remaining - 4.0) * after_5kg,
+    )
+    return np.where((zone_codes >= 0) & (weight_in_kg > 0), fees, 0.0)
+
+
+def jiomart_fixed_fee_array(customer_paid_amount, rate_card=None):
+    return slab_lookup((rate_card or active_rate_card()).jiomart_fixed_fee, customer_paid_amount)
+
+
+def calculate_taxable_amount_array(customer_paid_amount):
+    # Columnar calculate_taxable_amount_value, plus the TDS / TCS that follow from it
+    high_slab = customer_paid_amount >= 2500
+    taxable_amount_value = customer_paid_amount / np.where(high_slab, 1.12, 1.05)
+    tax_amount = customer_paid_amount - taxable_amount_value
+    return {
+        'invoice_tax_rate': np.where(high_slab, 0.12, 0.05),
+        'taxable_amount_value': taxable_amount_value,
+        'tds': taxable_amount_value * 0.001,
+        'tcs': tax_amount * 0.10,
+    }
+
+
+def jiomart_fee_cap_array(cpa, total_fee_base, benefit_rate, rate_card=None):
+    # --- Max fee cap --- (final fee base, GST on it, benefit amount); the only Jiomart step that reads the benefit rate
+    gst_rate = (rate_card or active_rate_card()).fee_gst_rate
+    max_fee_allowed = cpa * benefit_rate
+    capped = total_fee_base > max_fee_allowed
+    final_fee_base = np.where(capped, max_fee_allowed, total_fee_base)
+    return final_fee_base, final_fee_base * gst_rate, np.where(capped, -(total_fee_base - max_fee_allowed), 0.0)
+
+
+def _brand_rate_column(brand, rates):
+    # Per-row rate from a {brand: rate} dict, and which rows had a listed brand
+    rate = np.zeros(len(brand))
+    listed = np.zeros(len(brand), dtype=bool)
+    for name, value in rates.items():
+        match = brand == name
+        rate[match] = value
+        listed |= match
+    return rate, listed
+
+
+def _platform_fee_columns(name, cpa, taxable, royalty, brand, category, gender, kuchipoo_royalty,
+                          weight, zone_codes, jio_category, benefit_rate, meesho_rate, card):
+    # Fee fields and total deductions for rows that are all on platform `name`
+    gst_rate = card.fee_gst_rate
+    royalty_fee = np.where(royalty, cpa * card.royalty_rate, 0.0)
+
+    if name == 'Meesho':
+        commission_rate = meesho_rate
+        commission_base = cpa * commission_rate
+        final_commission = commission_base + commission_base * gst_rate
+        fees = {'commission_rate': commission_rate, 'final_commission': final_commission, 'royalty_fee': royalty_fee}
+        return fees, final_commission
+
+    elif name == 'Myntra':
+        b = brand
+        gt_base = slab_lookup(card.myntra_fixed_fee, taxable)
+        gt_charge = gt_base + gt_base * gst_rate
+        is_yk = np.isin(b, card.yk_brands)
+        yk_base = slab_lookup(card.myntra_yk_fixed_fee, taxable)
+        yk_fixed_fee = np.where(is_yk, yk_base + yk_base * gst_rate, 0.0)
+
+        seller_price = cpa - gt_charge
+        codes = rate_card_codes(card.myntra_commission, b, category, gender)
+        commission_rate = rate_card_lookup(card.myntra_commission, codes, seller_price)
+        commission_base = seller_price * commission_rate
+        final_commission = commission_base + commission_base * gst_rate
+
+        royalty_rate, _ = _brand_rate_column(b, card.myntra_royalty_rates)
+        flagged_rate, flagged = _brand_rate_column(b, card.myntra_flagged_royalty_rates)
+        flagged &= kuchipoo_royalty
+        royalty_rate[flagged] = flagged_rate[flagged]
+        marketing_rate, has_marketing = _brand_rate_column(b, card.myntra_marketing_fee_rates)
+        marketing_fee_base = np.where(has_marketing, cpa * marketing_rate, 0.0)
+
+        fees = {
+            'sale_price': seller_price,
+            'gt_charge': gt_charge,
+            'yk_fixed_fee': yk_fixed_fee,
+            'commission_rate': commission_rate,
+            'final_commission': final_commission,
+            'royalty_fee': cpa * royalty_rate,
+            'marketing_fee_base': marketing_fee_base,
+        }
+        return fees, final_commission + gt_charge + yk_fixed_fee + marketing_fee_base
+
+    elif name == 'FirstCry':
+        commission_rate = card.firstcry_commission_rate
+        final_commission = cpa * commission_rate
+        fees = {'commission_rate': commission_rate, 'final_commission': final_commission, 'royalty_fee': royalty_fee}
+        return fees, final_commission + 0.0 + 0.0
+
+    elif name == 'Ajio':
+        commission_rate = card.ajio_commission_rate
+        commission_base = cpa * commission_rate
+        final_commission = commission_base + commission_base * gst_rate
+        gt_charge = card.ajio_scm_fee + card.ajio_scm_fee * gst_rate
+        fees = {'commission_rate': commission_rate, 'final_commission': final_commission, 'gt_charge': gt_charge, 'royalty_fee': royalty_fee}
+        return fees, final_commission + 0.0 + gt_charge
+
+    elif name == 'Snapdeal':
+        commission_rate = card.snapdeal_commission_rate
+        commission_base = np.round(cpa * commission_rate)
+        final_commission = commission_base + np.round(commission_base * gst_rate)
+        ro_base = np.round(cpa * card.snapdeal_ro_fee_rate)
+        gt_charge = ro_base + np.round(ro_base * card.snapdeal_ro_fee_gst_rate)
+        fees = {'commission_rate': commission_rate, 'final_commission': final_commission, 'gt_charge': gt_charge, 'royalty_fee': royalty_fee}
+        return fees, final_commission + 0.0 + gt_charge
+
+    elif name == 'Jiomart':
+        codes = rate_card_codes(card.jiomart_commission, jio_category)
+        commission_rate = rate_card_lookup(card.jiomart_commission, codes, cpa)
+        comm_fee_base = cpa * commission_rate
+        fixed_fee_base = jiomart_fixed_fee_array(cpa, card)
+        shipping_fee_base = jiomart_shipping_fee_array(weight, zone_codes, card)
+        total_fee_base = comm_fee_base + fixed_fee_base + shipping_fee_base
+
+        final_fee_base, gst_on_fees, benefit_amount = jiomart_fee_cap_array(cpa, total_fee_base, benefit_rate, card)
+
+        fees = {
+            'commission_rate': commission_rate,
+            'final_commission': comm_fee_base,
+            'jiomart_fixed_fee_base': fixed_fee_base,
+            'jiomart_shipping_fee_base': shipping_fee_base,
+            'jiomart_total_fee_base': total_fee_base,
+            'jiomart_benefit_amount': benefit_amount,
+            'jiomart_final_applicable_fee_base': final_fee_base,
+            'jiomart_gst_on_fees': gst_on_fees,
+            'gt_charge': fixed_fee_base + shipping_fee_base,
+            'royalty_fee': royalty_fee,
+        }
+        return fees, final_fee_base + gst_on_fees
+
+    return {}, 0.0 # Unknown platform: no fees
+
+
+def perform_calculations_columnar(mrp, discount,
+                                  product_cost, platform,
+                                  myntra_new_brand=None, myntra_new_category=None, myntra_new_gender=None,
+                                  apply_kuchipoo_royalty=None,
+                                  weight_in_kg=None, shipping_zone=None, jiomart_category=None, jiomart_benefit_rate=0.0,
+                                  meesho_charge_rate=0.0, wrong_defective_price=None,
+                                  apply_royalty=None, fields=None, rate_card=None):
+    import pandas as pd # Deferred: the scalar engine runs on numpy alone
+
+    card = rate_card or active_rate_card()
+    mrp = np.asarray(mrp, dtype=float)
+    n = len(mrp)
+    discount = _float_column(discount, n, 0.0)
+    product_cost = _float_column(product_cost, n, 0.0)
+    platform = _object_column(platform, n)
+    brand = _object_column(myntra_new_brand, n)
+    category = _object_column(myntra_new_category, n)
+    gender = _object_column(myntra_new_gender, n)
+    kuchipoo_royalty = _bool_column(apply_kuchipoo_royalty, n)
+    weight = _float_column(weight_in_kg, n, 0.0)
+    zone_codes = _zone_code_column(shipping_zone, n, card)
+    jio_category = _object_column(jiomart_category, n)
+    benefit_rate = _float_column(jiomart_benefit_rate, n)
+    meesho_rate = _float_column(meesho_charge_rate, n)
+    wdp = _float_column(wrong_defective_price, n)
+    royalty = _bool_column(apply_royalty, n)
+
+    # --- (NEW) Only the requested fields are allocated ---
+    result = np.zeros(n, dtype=calculation_dtype(fields))
+    names = set(result.dtype.names)
+    def put(field, idx, values):
+        if field in names:
+            result[field][idx] = values
+
+    total_deductions = np.zeros(n)
+
+    # --- Sale price / invoice value ---
+    is_meesho = platform == 'Meesho'
+    sale_price = np.where(is_meesho, np.where(wdp > 0, wdp, mrp), mrp - discount)
+    customer_paid_amount = sale_price.copy()
+    put('sale_price', slice(None), sale_price)
+    put('customer_paid_amount', slice(None), customer_paid_amount)
+
+    # --- Common tax stage ---
+    tax = calculate_taxable_amount_array(customer_paid_amount)
+    for field in ('invoice_tax_rate', 'taxable_amount_value', 'tds', 'tcs'):
+        put(field, slice(None), tax[field])
+
+    # --- Platform specific fees ---
+    for name, idx in pd.Series(platform).groupby(platform, sort=False).indices.items():
+        fees, deductions = _platform_fee_columns(
+            name, customer_paid_amount[idx], tax['taxable_amount_value'][idx], royalty[idx],
+            brand[idx], category[idx], gender[idx], kuchipoo_royalty[idx],
+            weight[idx], zone_codes[idx], jio_category[idx], benefit_rate[idx], meesho_rate[idx], card
+        )
+        for field, values in fees.items():
+            put(field, idx, values)
+        total_deductions[idx] = deductions
+
+    settled_amount = customer_paid_amount - total_deductions - tax['tds'] - tax['tcs']
+    put('settled_amount', slice(None), settled_amount)
+    put('net_profit', slice(None), settled_amount - product_cost)
+
+    # --- Negative sale price: same early exit as perform_calculations ---
+    invalid = ~is_meesho & (sale_price < 0)
+    if invalid.any():
+        for field in names:
+            if field != 'sale_price':
+                result[field][invalid] = 0.0
+        put('sale_price', invalid, sale_price[invalid])
+        put('net_profit', invalid, -99999999.0)
+
+    return result
+
+
+# --- (NEW) Every row priced on several platforms at once ---
+# Same answer as perform_calculations_columnar with `platform` set to each channel in turn.
+# The sale price and tax stage depend only on the invoice value, so they are computed
+# once and shared by all channels (Meesho gets its own only when its invoice value differs).
+def perform_calculations_channels(mrp, discount,
+                                  product_cost, platforms,
+                                  myntra_new_brand=None, myntra_new_category=None, myntra_new_gender=None,
+                                  apply_kuchipoo_royalty=None,
+                                  weight_in_kg=None, shipping_zone=None, jiomart_category=None, jiomart_benefit_rate=0.0,
+                                  meesho_charge_rate=0.0, wrong_defective_price=None,
+                                  apply_royalty=None, fields=None, rate_card=None):
+    card = rate_card or active_rate_card()
+    mrp = np.asarray(mrp, dtype=float)
+    n = len(mrp)
+    discount = _float_column(discount, n, 0.0)
+    product_cost = _float_column(product_cost, n, 0.0)
+    wdp = _float_column(wrong_defective_price, n)
+    columns = (
+        _object_column(myntra_new_brand, n), _object_column(myntra_new_category, n), _object_column(myntra_new_gender, n),
+        _bool_column(apply_kuchipoo_royalty, n), _float_column(weight_in_kg, n, 0.0),
+        _zone_code_column(shipping_zone, n, card), _object_column(jiomart_category, n),
+        _float_column(jiomart_benefit_rate, n), _float_column(meesho_charge_rate, n),
+    )
+    royalty = _bool_column(apply_royalty, n)
+
+    # --- Shared sale price / invoice value and tax stage ---
+    sale_price = mrp - discount
+    tax = calculate_taxable_amount_array(sale_price)
+    meesho_price = np.where(wdp > 0, wdp, mrp)
+    meesho_tax = tax if np.array_equal(meesho_price, sale_price) else calculate_taxable_amount_array(meesho_price)
+    invalid = sale_price < 0
+
+    results = {}
+    for name in platforms:
+        is_meesho = name == 'Meesho'
+        price, price_tax = (meesho_price, meesho_tax) if is_meesho else (sale_price, tax)
+        result = np.zeros(n, dtype=calculation_dtype(fields))
+        names = set(result.dtype.names)
+        fees, deductions = _platform_fee_columns(name, price, price_tax['taxable_amount_value'], royalty, *columns, card)
+        parts = dict(price_tax, sale_price=price, customer_paid_amount=price)
+        parts.update(fees)
+        parts['settled_amount'] = price - deductions - price_tax['tds'] - price_tax['tcs']
+        parts['net_profit'] = parts['settled_amount'] - product_cost
+        for field in names:
+            if field in parts:
+                result[field] = parts[field]
+
+        # --- Negative sale price: same early exit as perform_calculations ---
+        if not is_meesho and invalid.any():
+            for field in names:
+                if field != 'sale_price':
+                    result[field][invalid] = 0.0
+            if 'sale_price' in names:
+                result['sale_price'][invalid] = sale_price[invalid]
+            if 'net_profit' in names:
+                result['net_profit'][invalid] = -99999999.0
+        results[name] = result
+    return results
+
+
+# --- (NEW) Batch target-margin solver ---
+# Same answer as find_discount_for_target_profit for every row, but each
+# breakpoint / line-inversion pass runs over all unresolved rows at once.
+def _first_failing_steps(profit_at, target_profit, first_step, last_step, break_steps,
+                         slack=None, fine_break_steps=None):
+    # Vector form of _first_failing_step; -1 where no step fails.
+    m = len(first_step)
+    failing = np.full(m, -1)
+    with np.errstate(invalid='ignore'):
+        low_guard = np.floor(break_steps - 1e-6)
+        high_guard = np.floor(break_steps + 1e-6) + 1
+    guards = np.concatenate([first_step[:, None], last_step[:, None],
+                             low_guard, low_guard + 1, high_guard], axis=1)
+    outside = np.isnan(guards) | (guards < first_step[:, None]) | (guards > last_step[:, None])
+    guards = np.sort(np.where(outside, last_step[:, None], guards), axis=1).astype(np.int64)
+
+    active = np.ones(m, dtype=bool)
+    previous = first_step - 1
+    for j in range(guards.shape[1]):
+        guard = guards[:, j]
+        on_line = np.flatnonzero(active & (guard > previous + 1))
+        if len(on_line):
+            k = _first_failing_on_lines(profit_at, target_profit, on_line, previous[on_line] + 1, guard[on_line] - 1,
+                                        None if slack is None else slack[on_line], fine_break_steps)
+            found = k >= 0
+            failing[on_line[found]] = k[found]
+            active[on_line[found]] = False
+        check = np.flatnonzero(active & (guard != previous))
+        if len(check):
+            below = profit_at(check, guard[check]) < target_profit[check]
+            failing[check[below]] = guard[check[below]]
+            active[check[below]] = False
+        previous = guard
+        if not active.any():
+            break
+    return failing
+
+
+def _first_failing_on_lines(profit_at, target_profit, rows, low, high, slack, fine_break_steps):
+    failing = np.full(len(rows), -1)
+    target = target_profit[rows]
+    profits = profit_at(np.concatenate([rows, rows]), np.concatenate([low, high]))
+    profit_low, profit_high = profits[:len(rows)], profits[len(rows):]
+    failing[profit_low < target] = low[profit_low < target]
+    open_rows = profit_low >= target
+
+    if slack is not None:
+        banded = open_rows & (slack > 0)
+        open_rows &= slack == 0
+        # Rounded fees: exact walk only where the line is within the rounding band
+        banded &= np.minimum(profit_low, profit_high) < target + 2 * slack
+        if banded.any():
+            b = np.flatnonzero(banded)
+            s = 2 * slack[b]
+            slope = (profit_high[b] - profit_low[b]) / (high[b] - low[b])
+            band_low, band_high = low[b].copy(), high[b].copy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                falling = slope < 0
+                band_low = np.where(falling, np.maximum(low[b], np.floor(low[b] + (profit_low[b] - target[b] - s) / -slope) - 1), band_low)
+                band_high = np.where(falling, np.minimum(high[b], np.ceil(low[b] + (profit_low[b] - target[b] + s) / -slope) + 1), band_high)
+                rising = slope > 0
+                band_high = np.where(rising, np.minimum(high[b], np.ceil(low[b] + (target[b] + s - profit_low[b]) / slope) + 1), band_high)
+            band_low, band_high = band_low.astype(np.int64), band_high.astype(np.int64)
+            sub_rows = rows[b]
+            failing[b] = _first_failing_steps(
+                lambda positions, steps: profit_at(sub_rows[positions], steps),
+                target_profit[sub_rows], band_low, band_high,
+                fine_break_steps(sub_rows, band_low, band_high))
+
+    open_rows &= profit_high < target
+    o = np.flatnonzero(open_rows)
+    if not len(o):
+        return failing
+    # Straight lines: invert them, then settle the exact step
+    lo, hi, t = low[o], high[o], target[o]
+    k = lo + (profit_low[o] - t) / (profit_low[o] - profit_high[o]) * (hi - lo)
+    k = np.minimum(np.maximum(np.floor(k).astype(np.int64), lo + 1), hi)
+    moving = np.flatnonzero(k > lo + 1)
+    while len(moving):
+        below = profit_at(rows[o[moving]], k[moving] - 1) < t[moving]
+        moving = moving[below]
+        k[moving] -= 1
+        moving = moving[k[moving] > lo[moving] + 1]
+    moving = np.arange(len(o))
+    while len(moving):
+        above = profit_at(rows[o[moving]], k[moving]) >= t[moving]
+        moving = moving[above]
+        k[moving] += 1
+    failing[o] = k
+    return failing
+
+
+def find_discount_for_target_profit_columnar(mrp, target_profit, product_cost, platform,
+                                             myntra_new_brand=None, myntra_new_category=None, myntra_new_gender=None,
+                                             apply_kuchipoo_royalty=None,
+                                             weight_in_kg=None, shipping_zone=None, jiomart_category=None, jiomart_benefit_rate=0.0,
+                                             meesho_charge_rate=0.0,
+                                             apply_royalty=None, precision=1.0, rate_card=None):
+    import pandas as pd
+
+    card = rate_card or active_rate_card()
+    mrp = np.asarray(mrp, dtype=float)
+    n = len(mrp)
+    target_profit = _float_column(target_profit, n).copy()
+    product_cost = _float_column(product_cost, n)
+    platform = _object_column(platform, n)
+    brand = _object_column(myntra_new_brand, n)
+    category = _object_column(myntra_new_category, n)
+    gender = _object_column(myntra_new_gender, n)
+    kuchipoo_royalty = _bool_column(apply_kuchipoo_royalty, n)
+    weight = _float_column(weight_in_kg, n, 0.0)
+    zone_codes = _zone_code_column(shipping_zone, n, card) # Coded once, not at every scan step
+    jio_category = _object_column(jiomart_category, n)
+    benefit_rate = _float_column(jiomart_benefit_rate, n)
+    meesho_rate = _float_column(meesho_charge_rate, n)
+    royalty = _bool_column(apply_royalty, n)
+    is_meesho = platform == 'Meesho'
+
+    def profit(rows, discount, wdp):
+        results = perform_calculations_columnar(
+            mrp[rows], discount, product_cost[rows], platform[rows],
+            brand[rows], category[rows], gender[rows], kuchipoo_royalty[rows],
+            weight[rows], zone_codes[rows], jio_category[rows], benefit_rate[rows],
+            meesho_rate[rows], wdp, royalty[rows],
+            fields=('net_profit', 'royalty_fee'), rate_card=card)
+        return results['net_profit'] - results['royalty_fee']
+
+    def discount_at(steps):
+        return np.round(steps * precision, 2)
+
+    def profit_at(rows, steps):
+        discount = discount_at(steps)
+        meesho = is_meesho[rows]
+        return profit(rows, np.where(meesho, 0.0, discount),
+                      np.where(meesho, np.round(mrp[rows] - discount, 2), np.nan))
+
+    all_rows = np.arange(n)
+    initial_profit = profit_at(all_rows, np.zeros(n))
+    feasible = initial_profit >= target_profit
+
+    last_step = np.floor(mrp / precision + 1e-9)
+    last_step = np.where(discount_at(last_step) > mrp, last_step - 1, last_step).astype(np.int64)
+
+    # --- Breakpoints only depend on a handful of attributes, so solve them per unique key ---
+    # (attributes a platform never reads are blanked, so e.g. all Ajio rows share one key)
+    is_myntra, is_jiomart = platform == 'Myntra', platform == 'Jiomart'
+    keys = pd.DataFrame({'platform': platform, 'brand': np.where(is_myntra, brand, None),
+                         'category': np.where(is_myntra, category, None), 'gender': np.where(is_myntra, gender, None),
+                         'weight': np.where(is_jiomart, weight, 0.0), 'zone': np.where(is_jiomart, zone_codes, -1),
+                         'jio_category': np.where(is_jiomart, jio_category, None),
+                         'benefit': np.where(is_jiomart, benefit_rate, 0.0)})
+    groups = keys.groupby(list(keys.columns), sort=False, dropna=False).indices
+    key_points = []
+    for (p, b, c, g, w, z, jc, r), idx in groups.items():
+        points = _target_profit_breakpoints(p, b, c, g, w, None if z < 0 else card.jiomart_shipping_zones[z], jc, r, card)
+        key_points.append((idx, points))
+    width = max((len(points) for _, points in key_points), default=1)
+    break_cpa = np.full((n, width), np.nan)
+    for idx, points in key_points:
+        break_cpa[idx, :len(points)] = points
+    break_steps = (mrp[:, None] - break_cpa) / precision
+
+    slack = np.where(platform == 'Snapdeal', _snapdeal_rounding_slack(card), 0.0)
+
+    def fine_break_steps(rows, low, high):
+        cpa_low = mrp[rows] - discount_at(high)
+        cpa_high = mrp[rows] - discount_at(low)
+        columns = []
+        for rate in (card.snapdeal_commission_rate, card.snapdeal_ro_fee_rate): # Commission and RO fee are rounded to the rupee
+            j = np.floor(cpa_low * rate - 0.5)
+            count = int(np.max(np.floor(cpa_high * rate - 0.5) - j, initial=0)) + 2
+            points = (j[:, None] + np.arange(count) + 0.5) / rate
+            columns.append(np.where(points <= cpa_high[:, None], points, np.nan))
+        return (mrp[rows][:, None] - np.concatenate(columns, axis=1)) / precision
+
+    solve = np.flatnonzero(feasible & (last_step >= 0))
+    failing_step = np.full(n, -1)
+    if len(solve):
+        failing_step[solve] = _first_failing_steps(
+            lambda positions, steps: profit_at(solve[positions], steps),
+            target_profit[solve], np.zeros(len(solve), dtype=np.int64), last_step[solve],
+            break_steps[solve], slack[solve],
+            lambda positions, low, high: fine_break_steps(solve[positions], low, high))
+
+    # --- Final discount per row ---
+    found = failing_step >= 0
+    discount_amount = np.where(found, np.maximum(0.0, discount_at(failing_step - 1)), mrp)
+    final_wdp = np.where(found, np.minimum(mrp - discount_at(failing_step) + precision, mrp), 0.0)
+    discount_amount = np.where(is_meesho & found, mrp - final_wdp, discount_amount)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discount_percent = np.where(found, (discount_amount / mrp) * 100, 100.0)
+    discount_percent = np.where(is_meesho & found & ~(mrp > 0), 0.0, discount_percent)
+
+    final_profit = profit(all_rows, np.where(is_meesho, 0.0, discount_amount), np.where(is_meesho, final_wdp, np.nan))
+    final_profit = np.where(feasible, final_profit, initial_profit)
+
+    return {
+        'discount_amount': np.where(feasible, discount_amount, np.nan),
+        'discount_percent': np.where(feasible, discount_percent, np.nan),
+        'net_profit': final_profit,
+        'feasible': feasible,
+    }
@@ -0,0 +1,155 @@
+import gzip
+import os
+
+import pandas as pd
+
+
+# --- Result export formats: extension and MIME type for downloads ---
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'xlsx': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+DEFAULT_EXPORT_CHUNK_ROWS = 50_000
+PREVIEW_ROWS = 1000 # Rows kept in memory for showing the results
+XLSX_MAX_ROWS = 1_048_576 # Per sheet, header included
+
+
+def export_format_for(path, default='csv'):
+    # Format from a file name, longest extension first (.csv.gz before .csv)
+    name = str(path).lower()
+    for fmt, (extension, _) in sorted(EXPORT_FORMATS.items(), key=lambda item: -len(item[1][0])):
+        if name.endswith(extension):
+            return fmt
+    return default
+
+
+def _sheet_name(name, part):
+    # Excel sheet names: at most 31 characters, none of []:*?/\
+    name = ''.join(' ' if ch in '[]:*?/\\' else ch for ch in str(name)).strip() or 'Results'
+    suffix = f" ({part})" if part > 1 else ''
+    return name[:31 - len(suffix)] + suffix
+
+
+# --- Incremental writer: results are appended chunk by chunk and never held whole ---
+# output is a path or a binary file. XLSX uses XlsxWriter's constant-memory mode with one
+# sheet per value of sheet_column (e.g. one per platform), continued on a new sheet past
+# Excel's row limit; without that column every row goes to sheet_name.
+class ResultsWriter:
+    def __init__(self, output, fmt='csv', sheet_column='Platform', sheet_name='Results'):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}; expected one of {tuple(EXPORT_FORMATS)}")
+        self.output = output
+        self.fmt = fmt
+        self.sheet_column = sheet_column
+        self.sheet_name = sheet_name
+        self.rows_written = 0
+        self.preview = None
+        self._file = None
+        self._owns_file = False
+        self._parquet = None
+        self._workbook = None
+        self._sheets = {} # sheet key -> [worksheet, next row, part]
+        self._columns = None
+
+    def _open_file(self, mode='wb'):
+        if isinstance(self.output, (str, os.PathLike)):
+            self._owns_file = True
+            return open(self.output, mode)
+        return self.output
+
+    def write(self, frame):
+        if frame.empty:
+            return
+        if self._columns is None:
+            self._columns = list(frame.columns)
+        if self.preview is None:
+            self.preview = frame.head(PREVIEW_ROWS).reset_index(drop=True)
+        elif len(self.preview) < PREVIEW_ROWS:
+            self.preview = pd.concat([self.preview, frame.head(PREVIEW_ROWS - len(self.preview))], ignore_index=True)
+
+        if self.fmt == 'csv':
+            if self._file is None:
+                self._file = self._open_file()
+            frame.to_csv(self._file, index=False, header=not self.rows_written)
+        elif self.fmt == 'csv.gz':
+            if self._file is None:
+                self._file = gzip.GzipFile(fileobj=self._open_file(), mode='wb', compresslevel=6)
+            self._file.write(frame.to_csv(index=False, header=not self.rows_written).encode('utf-8'))
+        elif self.fmt == 'parquet':
+            self._write_parquet(frame)
+        else:
+            self._write_xlsx(frame)
+        self.rows_written += len(frame)
+
+    def _write_parquet(self, frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._parquet is None:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            self._file = self._open_file()
+            self._parquet = pq.ParquetWriter(self._file, table.schema, compression='zstd')
+        else: # Later chunks are cast to the first chunk's schema
+            table = pa.Table.from_pandas(frame, schema=self._parquet.schema, preserve_index=False)
+        self._parquet.write_table(table)
+
+    def _write_xlsx(self, frame):
+        import xlsxwriter
+
+        if self._workbook is None:
+            self._file = self._open_file()
+            self._workbook = xlsxwriter.Workbook(self._file, {'constant_memory': True})
+            self._header_format = self._workbook.add_format({'bold': True})
+        if self.sheet_column in frame.columns:
+            groups = frame.groupby(self.sheet_column, sort=False, observed=True, dropna=False)
+        else:
+            groups = [(self.sheet_name, frame)]
+        for key, group in groups:
+            # Plain Python values; missing numbers become empty cells
+            columns = [group[col].astype(object).where(group[col].notna(), None).tolist() for col in self._columns]
+            for row in zip(*columns):
+                worksheet, row_number = self._sheet_row(key)
+                worksheet.write_row(row_number, 0, row)
+
+    def _sheet_row(self, key):
+        sheet = self._sheets.get(key)
+        if sheet is None or sheet[1] >= XLSX_MAX_ROWS:
+            part = 1 if sheet is None else sheet[2] + 1
+            worksheet = self._workbook.add_worksheet(_sheet_name(key if pd.notna(key) else 'Unknown', part))
+            worksheet.write_row(0, 0, self._columns, self._header_format)
+            sheet = self._sheets[key] = [worksheet, 1, part]
+        row_number = sheet[1]
+        sheet[1] += 1
+        return sheet[0], row_number
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._workbook is not None:
+            if not self._sheets:
+                self._workbook.add_worksheet(_sheet_name(self.sheet_name, 1))
+            self._workbook.close()
+        if isinstance(self._file, gzip.GzipFile):
+            raw = self._file.fileobj
+            self._file.close()
+            self._file = raw
+        if self._owns_file and self._file is not None:
+            self._file.close()
+        elif self._file is not None:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_results(results, output, fmt='csv', chunk_rows=DEFAULT_EXPORT_CHUNK_ROWS, **writer_options):
+    # A finished results frame, written chunk by chunk; returns the rows written
+    with ResultsWriter(output, fmt, **writer_options) as writer:
+        for start in range(0, len(results), chunk_rows):
+            writer.write(results.iloc[start:start + chunk_rows])
+    return writer.rows_written
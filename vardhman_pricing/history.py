@@ -0,0 +1,158 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from .rates import DEFAULT_RATE_CARD_PATH, load_rate_card
+
+
+RATE_CARD_EXTENSIONS = ('.json', '.toml', '.yaml', '.yml')
+RATE_CARD_HISTORY_DIR = os.environ.get('VARDHMAN_RATE_CARD_HISTORY', os.path.dirname(os.path.abspath(DEFAULT_RATE_CARD_PATH)))
+ORDER_DATE_COLUMN = 'order_date'
+
+_OPEN_START = pd.Timestamp.min.as_unit('ns')
+_OPEN_END = pd.Timestamp.max.as_unit('ns')
+_EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+_UTC_OFFSET = r'^(.*\d:\d{2}(?::\d{2}(?:\.\d+)?)?)\s*(?:Z|UTC|[+-]\d{2}:?\d{2})$' # Trailing offset after a time of day
+_EXCEL_MAX_SERIAL = (_OPEN_END.value - _EXCEL_EPOCH.as_unit('ns').value) // 86_400_000_000_000
+
+
+# --- Effective-dated rate cards: which card applied on which day ---
+# Each card covers [effective_from, effective_to). A missing effective_from reaches back
+# indefinitely; a missing effective_to runs until the next card starts (or forever for the
+# last one). Dates outside every card, and unparseable dates, map to code -1.
+class RateCardHistory:
+    def __init__(self, cards):
+        if not cards:
+            raise ValueError("A rate card history needs at least one rate card.")
+        cards = sorted(cards, key=lambda card: (card.effective_from is not None, card.effective_from or 0))
+        versions = [card.version for card in cards]
+        if len(set(versions)) != len(versions):
+            raise ValueError(f"Rate card versions must be unique, got {versions}")
+
+        starts, ends = [], []
+        for i, card in enumerate(cards):
+            start = _OPEN_START if card.effective_from is None else pd.Timestamp(card.effective_from)
+            if card.effective_to is not None:
+                end = pd.Timestamp(card.effective_to)
+            elif i + 1 < len(cards) and cards[i + 1].effective_from is not None:
+                end = pd.Timestamp(cards[i + 1].effective_from)
+            else:
+                end = _OPEN_END
+            if ends and start < ends[-1]:
+                raise ValueError(f"Rate cards {cards[i - 1].version} and {card.version} overlap; "
+                                 f"set effective_to on {cards[i - 1].version} or move effective_from on {card.version}.")
+            starts.append(start)
+            ends.append(end)
+
+        self.cards = tuple(cards)
+        self.versions = tuple(versions)
+        self.intervals = pd.IntervalIndex.from_arrays(pd.DatetimeIndex(starts).as_unit('ns'),
+                                                      pd.DatetimeIndex(ends).as_unit('ns'), closed='left')
+        self.digest = hashlib.sha256(':'.join(card.digest for card in cards).encode('utf-8')).hexdigest()
+        # Interval edges as int64 nanoseconds, for the lookup in codes()
+        self._starts = self.intervals.left.asi8
+        self._ends = self.intervals.right.asi8
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __repr__(self):
+        return f"RateCardHistory(versions={self.versions!r})"
+
+    def codes(self, dates):
+        # Position in self.cards of the card in effect on each date, -1 where none is.
+        # The intervals are sorted and disjoint, so one searchsorted over their starts
+        # finds every row's candidate; IntervalIndex.get_indexer gives the same answer
+        # but is far slower on a million dates.
+        values = parse_dates(dates).view(np.int64)
+        codes = np.searchsorted(self._starts, values, side='right') - 1
+        known = (codes >= 0) & (values != np.datetime64('NaT', 'ns').view(np.int64))
+        known[known] = values[known] < self._ends[codes[known]]
+        return np.where(known, codes, -1)
+
+    def card_on(self, date):
+        # The card in effect on one date, or None
+        code = self.codes([date])[0]
+        return self.cards[code] if code >= 0 else None
+
+
+def parse_dates(dates):
+    # datetime64[ns] per value, NaT where it is not a date. Order files repeat the same few
+    # hundred days, so only the distinct values are parsed: numbers as Excel serial dates,
+    # ISO dates next, then anything else day first (31/01/2025), as Indian sheets write them.
+    # Effective dates are local calendar dates, so timestamps keep their own wall-clock time
+    # and any UTC offset is dropped, not converted.
+    dates = pd.Series(dates) if not isinstance(dates, (pd.Series, pd.Index)) else dates
+    if dates.dtype.kind == 'M' or isinstance(dates.dtype, pd.DatetimeTZDtype):
+        parsed = pd.DatetimeIndex(dates)
+        if parsed.tz is not None:
+            parsed = parsed.tz_localize(None)
+        return parsed.as_unit('ns').to_numpy()
+    codes, uniques = pd.factorize(dates)
+    uniques = pd.Index(uniques, dtype=object)
+    parsed = np.full(len(uniques) + 1, np.datetime64('NaT', 'ns')) # Missing values (code -1) stay NaT
+    numeric = _is_number(dates.dtype, uniques)
+    if numeric.any():
+        parsed[:-1][numeric] = _excel_serial_dates(uniques[numeric].to_numpy(dtype=float))
+    text = np.flatnonzero(~numeric & uniques.notna())
+    if len(text):
+        values = _drop_utc_offsets(uniques[text])
+        parsed[text] = _to_datetime(values, format='ISO8601')
+        retry = np.isnat(parsed[text])
+        if retry.any(): # Each value in its own format, so '04/03/2025' and '4 March 2025' both parse
+            parsed[text[retry]] = _to_datetime(values[retry], format='mixed', dayfirst=True)
+    return parsed[codes]
+
+
+def _is_number(dtype, uniques):
+    if dtype.kind in 'iuf':
+        return np.ones(len(uniques), dtype=bool)
+    if isinstance(dtype, pd.StringDtype):
+        return np.zeros(len(uniques), dtype=bool)
+    return np.array([isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_))
+                     for value in uniques], dtype=bool)
+
+
+def _drop_utc_offsets(values):
+    # '2025-01-01T05:00:00+05:30' -> '2025-01-01T05:00:00'; values that are not strings are kept
+    values = values.to_numpy(dtype=object, copy=True)
+    strings = np.array([isinstance(value, str) for value in values], dtype=bool)
+    if strings.any():
+        values[strings] = pd.Series(values[strings], dtype=object).str.replace(_UTC_OFFSET, r'\1', regex=True).to_numpy()
+    return pd.Index(values, dtype=object)
+
+
+def _to_datetime(values, **options):
+    # Naive wall-clock datetime64[ns]; values left in several timezones are parsed one by one
+    try:
+        parsed = pd.to_datetime(values, errors='coerce', **options)
+    except ValueError: # Mixed timezones
+        parsed = pd.DatetimeIndex([_wall_clock(pd.to_datetime(value, errors='coerce', **options)) for value in values])
+    if parsed.tz is not None:
+        parsed = parsed.tz_localize(None)
+    return parsed.as_unit('ns').to_numpy()
+
+
+def _wall_clock(timestamp):
+    return timestamp.tz_localize(None) if timestamp is not pd.NaT and timestamp.tz is not None else timestamp
+
+
+def _excel_serial_dates(serials):
+    # Days since Excel's epoch (serial 45658 is 2025-01-01); NaT outside the datetime64[ns] range
+    days = np.where((serials >= 0) & (serials < _EXCEL_MAX_SERIAL), serials, np.nan)
+    return (_EXCEL_EPOCH + pd.to_timedelta(days, unit='D')).as_unit('ns').to_numpy()
+
+
+def rate_card_files(directory=RATE_CARD_HISTORY_DIR):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(RATE_CARD_EXTENSIONS))
+
+
+def load_rate_card_history(directory=RATE_CARD_HISTORY_DIR):
+    # Every rate-card file in `directory`, one version each
+    files = rate_card_files(directory)
+    if not files:
+        raise ValueError(f"No rate card files ({', '.join(RATE_CARD_EXTENSIONS)}) found in {directory}")
+    return RateCardHistory([load_rate_card(path) for path in files])
@@ -0,0 +1,176 @@
+import zipfile
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_STREAMING_THRESHOLD_MB = 512 # Uploads estimated above this are streamed, not loaded
+SAMPLE_BYTES = 1 << 20 # Head of a CSV used to estimate its in-memory size
+
+
+def clean_column_names(columns):
+    return [str(col).strip().lower().replace(' ', '_') for col in columns]
+
+
+def _is_excel(name):
+    return name.lower().endswith('.xlsx')
+
+
+def _separator(name):
+    # Myntra discount sheets (like sku.txt) are tab-separated
+    return '\t' if name.lower().endswith(('.txt', '.tsv')) else ','
+
+
+def _rewind(file):
+    if hasattr(file, 'seek'):
+        file.seek(0)
+
+
+# --- SKU file schema: columns not listed here stay text ---
+NUMERIC_COLUMNS = (
+    'product_mrp', 'mrp', 'product_mrp_', 'product_cost', 'cost_price', 'selling_price',
+    'product_weight_kg', 'product_weight', 'discount',
+)
+CATEGORICAL_COLUMNS = (
+    'platform', 'myntra_brand', 'brand', 'myntra_article_type', 'article_type', 'myntra_gender', 'gender',
+    'jiomart_category', 'category', 'shipping_zone',
+)
+SKU_COLUMNS = ('seller_sku_code', 'sku_code')
+
+
+# --- Parse a text column once; values float() rejects are flagged, not raised ---
+def parse_float_column(column):
+    if pd.api.types.is_float_dtype(column.dtype):
+        return column.to_numpy(dtype=float), np.zeros(len(column), dtype=bool)
+    values = column.to_numpy(dtype=object)
+    try:
+        return values.astype(float), np.zeros(len(values), dtype=bool)
+    except (ValueError, TypeError):
+        pass
+    parsed = np.full(len(values), np.nan)
+    failed = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        try:
+            parsed[i] = float(value)
+        except (ValueError, TypeError):
+            failed[i] = True
+    return parsed, failed
+
+
+def apply_sku_schema(df, coerced=None):
+    # Numeric columns become float64 (values float() rejects turn into NaN and their
+    # SKUs are added to coerced[column]); low-cardinality text becomes Categorical.
+    sku_col = next((col for col in SKU_COLUMNS if col in df.columns), None)
+    for col in df.columns:
+        if col in NUMERIC_COLUMNS:
+            values, failed = parse_float_column(df[col])
+            df[col] = values
+            if failed.any() and coerced is not None:
+                labels = df[sku_col].to_numpy(dtype=object)[failed] if sku_col else np.flatnonzero(failed) + 2 # File line numbers
+                coerced.setdefault(col, []).extend(str(label) for label in labels)
+        elif col in CATEGORICAL_COLUMNS and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def coercion_message(coerced):
+    parts = [f"{col}: {len(labels)} ({', '.join(labels[:5])}{' ...' if len(labels) > 5 else ''})" for col, labels in coerced.items()]
+    return "Non-numeric values were read as blank (rows without a valid MRP, cost or selling price are skipped). " + "; ".join(parts)
+
+
+def _csv_dtypes(file, sep=','):
+    # Read categorical columns straight into categories; everything else as text for the schema pass
+    header = pd.read_csv(file, sep=sep, encoding='utf-8-sig', dtype=str, nrows=0).columns
+    _rewind(file)
+    return {raw: 'category' if col in CATEGORICAL_COLUMNS else str for raw, col in zip(header, clean_column_names(header))}
+
+
+def read_sku_file(file, name, coerced=None):
+    _rewind(file)
+    if _is_excel(name):
+        df = pd.read_excel(file, dtype=str, engine='openpyxl')
+    else:
+        # --- (FIX) Use utf-8-sig to handle BOM ---
+        sep = _separator(name)
+        df = pd.read_csv(file, sep=sep, encoding='utf-8-sig', dtype=_csv_dtypes(file, sep))
+    df.columns = clean_column_names(df.columns)
+    return apply_sku_schema(df, coerced)
+
+
+# --- Estimated size of the typed DataFrame read_sku_file would build ---
+def estimate_upload_bytes(file, name):
+    _rewind(file)
+    if _is_excel(name):
+        # Cell text sits uncompressed in the sheet XML, which is close to the size pandas ends up holding
+        with zipfile.ZipFile(file) as archive:
+            size = sum(info.file_size for info in archive.infolist() if info.filename.startswith('xl/worksheets/'))
+            size += sum(info.file_size for info in archive.infolist() if info.filename == 'xl/sharedStrings.xml')
+        _rewind(file)
+        return size
+
+    sample = file.read(SAMPLE_BYTES)
+    sample_size = len(sample)
+    total = file.seek(0, 2)
+    _rewind(file)
+    if not sample_size:
+        return 0
+
+    # Parse only whole lines from the sample and scale its deep memory usage to the full file
+    if total > sample_size:
+        sample = sample[:sample.rfind(b'\n') + 1] or sample
+    try:
+        head = pd.read_csv(BytesIO(sample), sep=_separator(name), encoding='utf-8-sig', dtype=str)
+    except (ValueError, UnicodeDecodeError, pd.errors.ParserError):
+        return total
+    head.columns = clean_column_names(head.columns)
+    head = apply_sku_schema(head)
+    used = head.memory_usage(deep=True).sum()
+    return int(used * total / len(sample))
+
+
+def _excel_cell_text(value):
+    # Same text pd.read_excel(dtype=str) produces for a cell
+    if value is None:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _iter_excel_chunks(file, chunk_rows, coerced):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = clean_column_names(
+            col if col is not None else f"Unnamed: {i}" for i, col in enumerate(header))
+        block = []
+        for row in rows:
+            if all(value is None for value in row): # read_excel drops blank rows too
+                continue
+            block.append([_excel_cell_text(value) for value in row[:len(columns)]])
+            if len(block) == chunk_rows:
+                yield apply_sku_schema(pd.DataFrame(block, columns=columns, dtype=object), coerced)
+                block = []
+        if block:
+            yield apply_sku_schema(pd.DataFrame(block, columns=columns, dtype=object), coerced)
+    finally:
+        workbook.close()
+
+
+# --- Read an upload as bounded DataFrame chunks (same columns and types as read_sku_file) ---
+def iter_sku_file_chunks(file, name, chunk_rows, coerced=None):
+    _rewind(file)
+    if _is_excel(name):
+        yield from _iter_excel_chunks(file, chunk_rows, coerced)
+        return
+    sep = _separator(name)
+    with pd.read_csv(file, sep=sep, encoding='utf-8-sig', dtype=_csv_dtypes(file, sep), chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            chunk.columns = clean_column_names(chunk.columns)
+            yield apply_sku_schema(chunk, coerced)
@@ -0,0 +1,158 @@
+import math
+import threading
+import time
+
+import pandas as pd
+
+from .bulk import DEFAULT_CHUNK_SIZE, BulkPipeline, _failed_rows_message, run_bulk_processing
+from .rates import active_rate_card
+
+
+# --- Background bulk job: prices input chunks on a worker thread ---
+# price_chunk(chunk, failed_skus, on_warning) returns the results for one input chunk;
+# each one is appended to writer (a ResultsWriter) as soon as it is done. The job can be
+# cancelled between chunks, which keeps the results written so far. start() runs it on a
+# worker thread; run() runs it on the calling thread (e.g. so cProfile sees it).
+class BulkJob:
+    def __init__(self, chunks, price_chunk, writer, total_rows=None, keep_results=True):
+        self.writer = writer
+        self.total_rows = total_rows
+        self.keep_results = keep_results
+        self.state = 'queued' # queued, running, done, cancelled or failed
+        self.rows_read = 0
+        self.rows_written = 0
+        self.warnings = []
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._chunks = chunks
+        self._price_chunk = price_chunk
+        self._parts = []
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self.run, name='bulk-job', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.state = 'running'
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def running(self):
+        return self.state in ('queued', 'running')
+
+    def run(self):
+        if self.started is None:
+            self.started = time.perf_counter()
+            self.state = 'running'
+        failed_skus = []
+        try:
+            with self.writer:
+                for chunk in self._chunks:
+                    if self._cancel.is_set():
+                        break
+                    results = self._price_chunk(chunk, failed_skus, self.warnings.append)
+                    if not results.empty:
+                        self.writer.write(results)
+                        if self.keep_results:
+                            self._parts.append(results)
+                        self.rows_written += len(results)
+                    self.rows_read += len(chunk)
+            if len(self._parts) > 1:
+                self._parts = [pd.concat(self._parts, ignore_index=True)]
+            self.state = 'cancelled' if self._cancel.is_set() else 'done'
+        except Exception as e: # Reported in the page; the thread would otherwise end silently
+            self.error = str(e)
+            self.state = 'failed'
+        finally:
+            if failed_skus:
+                self.warnings.append(_failed_rows_message(failed_skus))
+            self.finished = time.perf_counter()
+
+    # --- Progress ---
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def fraction(self):
+        # None when the input size is unknown (streamed uploads)
+        if not self.total_rows:
+            return None
+        return min(self.rows_read / self.total_rows, 1.0)
+
+    @property
+    def eta_seconds(self):
+        if not self.total_rows or not self.rows_per_second:
+            return None
+        return max(self.total_rows - self.rows_read, 0) / self.rows_per_second
+
+    def results(self):
+        # Everything priced so far when results are kept, otherwise the writer's preview rows
+        parts = list(self._parts)
+        if len(parts) == 1: # Always the case once finished
+            return parts[0]
+        if parts:
+            return pd.concat(parts, ignore_index=True)
+        if self.writer.preview is not None:
+            return self.writer.preview
+        return pd.DataFrame()
+
+
+def _ignore_warning(message):
+    pass
+
+
+def bulk_pricing_job(source, writer, bulk_platform, mode, target_margin=0.0, meesho_charge=0.0, jio_benefit=0.0,
+                     chunk_rows=DEFAULT_CHUNK_SIZE, workers=1, pipelines=None, profiler=None, rate_card=None,
+                     rate_history=None):
+    # Unstarted BulkJob for run_bulk_processing over a DataFrame (priced in chunk_rows slices)
+    # or an iterable of raw upload chunks (streamed; only the preview rows are kept).
+    # pipelines: dict reused across runs on the same DataFrame, so each slice keeps its
+    # BulkPipeline and a parameter change only recomputes the stages that read it.
+    # Every chunk is priced with the rate card active when the job is created, or by order
+    # date from rate_history (a RateCardHistory).
+    card = rate_card or active_rate_card()
+    if isinstance(source, pd.DataFrame):
+        total_rows = len(source)
+        starts = iter(range(0, total_rows, chunk_rows))
+        chunks = (source.iloc[start:start + chunk_rows] for start in range(0, total_rows, chunk_rows))
+    else:
+        total_rows = starts = None
+        chunks = source
+    # Each chunk is split across the pool in shards of this size; sharding at chunk_rows would
+    # never split a chunk, leaving every slice to run in this process
+    shard_rows = max(math.ceil(chunk_rows / workers), 1) if (workers or 1) > 1 else chunk_rows
+
+    def price_chunk(chunk, failed_skus, on_warning):
+        start = next(starts) if starts is not None else None # Chunks are priced in order
+        if pipelines is None or start is None or workers > 1 or rate_history is not None:
+            return run_bulk_processing(
+                chunk, bulk_platform, mode, target_margin, meesho_charge, jio_benefit,
+                workers, shard_rows, on_warning=on_warning, profiler=profiler, rate_card=card,
+                rate_history=rate_history, _failed_skus=failed_skus
+            )
+        key = (start, chunk_rows, bulk_platform, mode)
+        pipeline = pipelines.get(key)
+        if pipeline is None:
+            pipeline = pipelines[key] = BulkPipeline(chunk, bulk_platform, mode)
+        pipeline.on_warning = _ignore_warning # Failed rows are reported once for the whole job
+        results = pipeline.run(target_margin, meesho_charge, jio_benefit, profiler, card)
+        failed_skus.extend(pipeline.failed_skus)
+        return results
+
+    return BulkJob(chunks, price_chunk, writer, total_rows, keep_results=total_rows is not None)
@@ -0,0 +1,133 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024 # Bytes on macOS, KB on Linux
+
+
+def _no_lap(name=None):
+    pass
+
+
+# --- Opt-in per-stage profiler for bulk runs ---
+# Stages are recorded either as laps (time since the previous lap, for straight-line code)
+# or with the stage() context manager. Memory per stage is the tracemalloc peak.
+class StageProfiler:
+    def __init__(self, trace_memory=True, profile_calls=True):
+        self.trace_memory = trace_memory
+        self.profile_calls = profile_calls
+        self.stages = []
+        self.top_allocations = []
+        self._profile = None
+        self._owns_tracing = False
+        self._last = None
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        if self.profile_calls:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self.lap()
+        return self
+
+    def stop(self, top=10):
+        if self._profile is not None:
+            self._profile.disable()
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            ])
+            self.top_allocations = [
+                {'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 'size_mb': stat.size / (1024 * 1024), 'blocks': stat.count}
+                for stat in snapshot.statistics('lineno')[:top]
+            ]
+            if self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+
+    __enter__ = start
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _record(self, name, seconds):
+        traced_peak = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.reset_peak()
+        self.stages.append({'stage': name, 'seconds': seconds, 'traced_peak_mb': traced_peak, 'peak_rss_mb': peak_rss_mb()})
+
+    def lap(self, name=None):
+        # Records the time since the previous lap as stage `name`; without a name only restarts the clock
+        now = time.perf_counter()
+        if name is not None and self._last is not None:
+            self._record(name, now - self._last)
+        elif self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._last = now
+
+    @contextmanager
+    def stage(self, name):
+        self.lap()
+        try:
+            yield
+        finally:
+            self.lap(name)
+
+    def add(self, name, seconds):
+        # A stage timed elsewhere, e.g. the upload parse of an earlier rerun
+        self.stages.append({'stage': name, 'seconds': seconds, 'traced_peak_mb': None, 'peak_rss_mb': None})
+
+    def table(self):
+        # One row per stage name (streamed runs repeat stages per chunk), in first-seen order
+        rows = {}
+        for stage in self.stages:
+            row = rows.setdefault(stage['stage'], {'stage': stage['stage'], 'calls': 0, 'seconds': 0.0,
+                                                   'traced_peak_mb': None, 'peak_rss_mb': None})
+            row['calls'] += 1
+            row['seconds'] += stage['seconds']
+            for key in ('traced_peak_mb', 'peak_rss_mb'):
+                if stage[key] is not None:
+                    row[key] = max(row[key] or 0.0, stage[key])
+        total = sum(row['seconds'] for row in rows.values()) or 1.0
+        return [dict(row, share=row['seconds'] / total) for row in rows.values()]
+
+    def pstats_text(self, sort='cumulative', limit=40):
+        if self._profile is None:
+            return ''
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def pstats_bytes(self):
+        # Binary pstats dump, loadable with pstats.Stats(path) or snakeviz
+        if self._profile is None:
+            return b''
+        fd, path = tempfile.mkstemp(suffix='.pstats')
+        os.close(fd)
+        try:
+            self._profile.dump_stats(path)
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
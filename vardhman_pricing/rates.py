@@ -0,0 +1,269 @@
+import datetime
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+# ==============================================================================
+# --- (NEW) RATE-CARD COMPILER ---
+# ==============================================================================
+# Slab dicts ("0-200", "200-300", ..., "800+") are compiled into sorted upper-bound
+# arrays: a value falls in the first slab whose upper bound is >= the value, so
+# np.searchsorted(..., side='left') gives the slab for scalars and columns alike.
+def _parse_slab_key(key, source):
+    text = str(key).strip()
+    try:
+        if text.endswith('+'):
+            low, high = float(text[:-1]), np.inf
+        else:
+            low, high = (float(part) for part in text.split('-'))
+    except ValueError:
+        raise ValueError(f"Malformed slab '{key}' in {source}") from None
+    if not low < high:
+        raise ValueError(f"Malformed slab '{key}' in {source}")
+    return low, high
+
+
+def compile_slab_table(slabs, source):
+    parsed = sorted(_parse_slab_key(key, source) + (rate,) for key, rate in slabs.items())
+    expected_low = 0.0
+    for low, high, rate in parsed:
+        if low != expected_low:
+            raise ValueError(f"Slabs in {source} must run contiguously from 0, got {list(slabs)}")
+        if not isinstance(rate, (int, float)) or rate < 0:
+            raise ValueError(f"Invalid rate {rate!r} in {source}")
+        expected_low = high
+    if expected_low != np.inf:
+        raise ValueError(f"Slabs in {source} must end with an open slab such as '2000+', got {list(slabs)}")
+    return {
+        'bounds': np.array([high for _, high, _ in parsed[:-1]], dtype=float),
+        'values': np.array([rate for _, _, rate in parsed], dtype=float),
+    }
+
+
+def compile_rate_card(data, levels, source):
+    keys, tables = [], []
+
+    def walk(node, path):
+        if len(path) == levels:
+            keys.append(path)
+            tables.append(compile_slab_table(node, " > ".join((source,) + path)))
+            return
+        for name, child in node.items():
+            walk(child, path + (name,))
+
+    walk(data, ())
+
+    # Integer-code every key; keys sharing the same slab boundaries share a schedule
+    schedules = []
+    schedule = np.empty(len(keys), dtype=np.intp)
+    values = np.zeros((len(keys), max(len(table['values']) for table in tables)))
+    for code, table in enumerate(tables):
+        for number, bounds in enumerate(schedules):
+            if np.array_equal(bounds, table['bounds']):
+                break
+        else:
+            number = len(schedules)
+            schedules.append(table['bounds'])
+        schedule[code] = number
+        values[code, :len(table['values'])] = table['values']
+
+    return {
+        'codes': {key: code for code, key in enumerate(keys)},
+        'index': None, # pandas index over the keys, built on first columnar lookup
+        'schedule': schedule,
+        'bounds': schedules,
+        'values': values,
+    }
+
+
+def slab_lookup(table, value):
+    return table['values'][np.searchsorted(table['bounds'], value, side='left')]
+
+
+def rate_card_codes(card, *columns):
+    import pandas as pd # Deferred so scalar use of the rate cards does not load pandas
+
+    if card['index'] is None:
+        keys = list(card['codes'])
+        card['index'] = pd.Index([key[0] for key in keys]) if len(columns) == 1 else pd.MultiIndex.from_tuples(keys)
+    if len(columns) == 1:
+        return card['index'].get_indexer(pd.Index(np.asarray(columns[0], dtype=object)))
+    return card['index'].get_indexer(pd.MultiIndex.from_arrays([np.asarray(column, dtype=object) for column in columns]))
+
+
+def rate_card_lookup(card, codes, values):
+    rates = np.zeros(len(values))
+    known = codes >= 0
+    schedule = card['schedule'][codes]
+    for number, bounds in enumerate(card['bounds']):
+        idx = np.flatnonzero(known & (schedule == number))
+        if len(idx):
+            rates[idx] = card['values'][codes[idx], np.searchsorted(bounds, values[idx], side='left')]
+    return rates
+
+
+def rate_card_rate(card, key, value):
+    code = card['codes'].get(key)
+    if code is None:
+        return 0.0
+    bounds = card['bounds'][card['schedule'][code]]
+    return float(card['values'][code, np.searchsorted(bounds, value, side='left')])
+
+
+# ==============================================================================
+# --- (NEW) RATE-CARD FILES ---
+# ==============================================================================
+# Rates live in versioned files (JSON, TOML or YAML) rather than in code; see
+# rate_cards/default.json for the layout. A RateCard is the compiled form of one file.
+# The engine prices with the active card unless a call is given one explicitly.
+BUNDLED_RATE_CARD_PATH = os.path.join(os.path.dirname(__file__), 'rate_cards', 'default.json')
+DEFAULT_RATE_CARD_PATH = os.environ.get('VARDHMAN_RATE_CARD', BUNDLED_RATE_CARD_PATH)
+SHIPPING_SLAB_FIELDS = ('first_0.5kg', 'next_0.5kg', 'per_kg_upto_5kg', 'per_kg_after_5kg')
+
+
+def _parse_rate_card(raw, path):
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension == '.json':
+        return json.loads(raw)
+    if extension == '.toml':
+        import tomllib
+        return tomllib.loads(raw.decode('utf-8'))
+    if extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"Reading {path} needs PyYAML (pip install pyyaml); JSON and TOML rate cards need nothing extra.") from None
+        return yaml.safe_load(raw)
+    raise ValueError(f"Unsupported rate card format '{extension}' for {path}; use .json, .toml or .yaml")
+
+
+def _rate(data, path, source):
+    # Value at a path such as ('ajio', 'scm_fee') or 'ajio.scm_fee', with the file named in errors
+    parts = tuple(path.split('.')) if isinstance(path, str) else path
+    value = data
+    for part in parts:
+        if not isinstance(value, dict) or part not in value:
+            raise ValueError(f"Rate card {source} is missing '{'.'.join(parts)}'")
+        value = value[part]
+    return value
+
+
+def _rate_number(data, path, source):
+    value = _rate(data, path, source)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        name = path if isinstance(path, str) else '.'.join(path)
+        raise ValueError(f"Invalid rate {value!r} for '{name}' in rate card {source}")
+    return value
+
+
+def _rate_date(data, key, source):
+    # Optional ISO date ('2025-07-01'); TOML and YAML may already give a date
+    value = data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r} for '{key}' in rate card {source}; use YYYY-MM-DD") from None
+
+
+def _brand_rates(data, path, source):
+    return {brand: _rate_number(data, (*path.split('.'), brand), source) for brand in _rate(data, path, source)}
+
+
+class RateCard:
+    def __init__(self, data, source='<memory>', digest=None):
+        self.data = data
+        self.source = source
+        self.digest = digest or hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+        self.version = str(_rate(data, 'version', source))
+        # Effective period [effective_from, effective_to), used by RateCardHistory; both optional
+        self.effective_from = _rate_date(data, 'effective_from', source)
+        self.effective_to = _rate_date(data, 'effective_to', source)
+        if self.effective_from and self.effective_to and self.effective_to <= self.effective_from:
+            raise ValueError(f"Rate card {source} ends ({self.effective_to}) before it starts ({self.effective_from})")
+
+        self.fee_gst_rate = _rate_number(data, 'gst_rate_on_fees', source)
+        self.royalty_rate = _rate_number(data, 'royalty_rate', source) # Other portals, for royalty SKUs
+
+        self.myntra_commission_data = _rate(data, 'myntra.commission', source)
+        self.myntra_commission = compile_rate_card(self.myntra_commission_data, 3, f"{source} > myntra.commission")
+        self.myntra_fixed_fee = compile_slab_table(_rate(data, 'myntra.fixed_fee', source), f"{source} > myntra.fixed_fee")
+        self.myntra_yk_fixed_fee = compile_slab_table(_rate(data, 'myntra.yk_fixed_fee', source), f"{source} > myntra.yk_fixed_fee")
+        self.yk_brands = tuple(_rate(data, 'myntra.yk_brands', source))
+        self.myntra_royalty_rates = _brand_rates(data, 'myntra.royalty_rates', source)
+        # Applied only when the KUCHIPOO royalty flag is 'Yes'
+        self.myntra_flagged_royalty_rates = _brand_rates(data, 'myntra.flagged_royalty_rates', source)
+        self.myntra_marketing_fee_rates = _brand_rates(data, 'myntra.marketing_fee_rates', source)
+
+        self.jiomart_commission_data = _rate(data, 'jiomart.commission', source)
+        self.jiomart_commission = compile_rate_card(self.jiomart_commission_data, 1, f"{source} > jiomart.commission")
+        self.jiomart_fixed_fee = compile_slab_table(_rate(data, 'jiomart.fixed_fee', source), f"{source} > jiomart.fixed_fee")
+        # Shipping: one row per zone code, columns as SHIPPING_SLAB_FIELDS; unknown zones pay the first zone's rates
+        shipping = _rate(data, 'jiomart.shipping', source)
+        if not shipping:
+            raise ValueError(f"Rate card {source} needs at least one zone in 'jiomart.shipping'")
+        self.jiomart_shipping_zones = tuple(shipping)
+        self.jiomart_shipping_zone_codes = {zone: code for code, zone in enumerate(self.jiomart_shipping_zones)}
+        self.jiomart_shipping_rates = np.array([
+            [_rate_number(data, ('jiomart', 'shipping', zone, field), source) for field in SHIPPING_SLAB_FIELDS]
+            for zone in self.jiomart_shipping_zones
+        ])
+
+        self.firstcry_commission_rate = _rate_number(data, 'firstcry.commission_rate', source)
+        self.ajio_commission_rate = _rate_number(data, 'ajio.commission_rate', source)
+        self.ajio_scm_fee = _rate_number(data, 'ajio.scm_fee', source)
+        self.snapdeal_commission_rate = _rate_number(data, 'snapdeal.commission_rate', source)
+        self.snapdeal_ro_fee_rate = _rate_number(data, 'snapdeal.ro_fee_rate', source)
+        self.snapdeal_ro_fee_gst_rate = _rate_number(data, 'snapdeal.ro_fee_gst_rate', source)
+
+    def __repr__(self):
+        return f"RateCard(version={self.version!r}, source={self.source!r}, digest={self.digest[:12]!r})"
+
+
+def rate_card_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_rate_card(path):
+    # Read and compile a rate-card file; the digest is the SHA-256 of its bytes
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return RateCard(_parse_rate_card(raw, path), str(path), hashlib.sha256(raw).hexdigest())
+
+
+# --- Active card: loaded once per process, replaced with use_rate_card() ---
+_active_rate_card = load_rate_card(DEFAULT_RATE_CARD_PATH)
+
+
+def active_rate_card():
+    return _active_rate_card
+
+
+def use_rate_card(card):
+    global _active_rate_card
+    _active_rate_card = card
+    return card
+
+
+# --- Rates of the card loaded at import, under their original names ---
+_loaded = _active_rate_card
+MYNTRA_COMMISSION_DATA = _loaded.myntra_commission_data
+JIOMART_COMMISSION_RATES = _loaded.jiomart_commission_data
+YK_BRANDS = _loaded.yk_brands
+MYNTRA_COMMISSION_CARD = _loaded.myntra_commission
+MYNTRA_FIXED_FEE_TABLE = _loaded.myntra_fixed_fee
+MYNTRA_YK_FIXED_FEE_TABLE = _loaded.myntra_yk_fixed_fee
+JIOMART_COMMISSION_CARD = _loaded.jiomart_commission
+JIOMART_FIXED_FEE_TABLE = _loaded.jiomart_fixed_fee
+JIOMART_SHIPPING_ZONES = _loaded.jiomart_shipping_zones
+JIOMART_SHIPPING_ZONE_CODES = _loaded.jiomart_shipping_zone_codes
+JIOMART_SHIPPING_RATES = _loaded.jiomart_shipping_rates
@@ -0,0 +1,100 @@
+import io
+import zipfile
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .bulk import _compute_bulk_columns, _take_shard, prepare_bulk_columns, pricing_input_groups
+from .profiling import _no_lap
+from .rates import active_rate_card
+
+
+SWEEP_UNITS = ('amount', 'percent') # Grid step in ₹, or in % of each SKU's MRP
+SWEEP_METRICS = {'net_profit': 'Net_Profit', 'settled_amount': 'Final_Settled_Amount'}
+DEFAULT_SWEEP_BLOCK_CELLS = 1_000_000 # SKU x grid cells priced per engine call
+
+# --- SKU x discount matrices; rows follow the usable input rows, columns follow grid ---
+# Grid points past a SKU's MRP are NaN in both matrices.
+DiscountSweep = namedtuple('DiscountSweep', ['sku', 'mrp', 'cost', 'platform', 'grid', 'unit', 'net_profit', 'settled_amount'])
+
+
+def discount_grid(step, points, unit='amount'):
+    if unit not in SWEEP_UNITS:
+        raise ValueError(f"Unknown sweep unit {unit!r}; expected one of {SWEEP_UNITS}")
+    if step <= 0 or points < 1:
+        raise ValueError("The sweep needs a positive step and at least one point.")
+    return np.arange(points) * float(step)
+
+
+def grid_labels(sweep):
+    return [f"{value:g}%" if sweep.unit == 'percent' else f"₹{value:g}" for value in sweep.grid]
+
+
+def run_discount_sweep(df, bulk_platform, step=10.0, points=200, unit='amount', meesho_charge=0.0, jio_benefit=0.0,
+                       block_cells=DEFAULT_SWEEP_BLOCK_CELLS, on_warning=None, profiler=None, rate_card=None):
+    # perform_calculations at every grid discount for every SKU: the prepared columns are
+    # repeated across the grid and priced in blocks of whole SKUs, then reshaped to SKU x grid.
+    # Returns a DiscountSweep, or None when no row is usable.
+    lap = profiler.lap if profiler else _no_lap
+    lap()
+    grid = discount_grid(step, points, unit)
+    card = rate_card or active_rate_card() # One card for every block
+    # Cost-price mode reads SKU, MRP, cost and attributes only; the selling price comes from the grid
+    columns = prepare_bulk_columns(df, bulk_platform, 'Check With Cost Price', on_warning, profiler=profiler)
+    if columns is None:
+        return None
+
+    # SKUs with identical pricing inputs share one row of the grid
+    first, groups = pricing_input_groups(columns)
+    unique = columns if first is None else _take_shard(columns, first)
+
+    n, k = len(unique['mrp']), len(grid)
+    net_profit = np.empty((n, k))
+    settled_amount = np.empty((n, k))
+    block_rows = max(1, block_cells // k)
+    for start in range(0, n, block_rows):
+        rows = np.repeat(np.arange(start, min(start + block_rows, n)), k)
+        block = {name: column[rows] if isinstance(column, (np.ndarray, pd.Categorical)) else column
+                 for name, column in unique.items() if name not in ('sku', 'passthrough')}
+        discount = np.tile(grid, len(rows) // k)
+        if unit == 'percent':
+            discount = block['mrp'] * discount / 100.0
+        block['selling_price'] = block['mrp'] - discount # Also the WDP for Meesho, as in bulk mode
+        computed = _compute_bulk_columns(block, 'Check With Selling Price', 0.0, meesho_charge, jio_benefit, card)
+        net_profit[start:start + block_rows] = computed['Net_Profit'].reshape(-1, k)
+        settled_amount[start:start + block_rows] = computed['Final_Settled_Amount'].reshape(-1, k)
+    if first is not None:
+        net_profit, settled_amount = net_profit[groups], settled_amount[groups]
+    lap('sweep computation')
+
+    mrp = columns['mrp']
+    n = len(mrp)
+
+    beyond_mrp = (grid[None, :] > 100.0) if unit == 'percent' else (grid[None, :] > mrp[:, None])
+    beyond_mrp = np.broadcast_to(beyond_mrp, (n, k))
+    net_profit[beyond_mrp] = np.nan
+    settled_amount[beyond_mrp] = np.nan
+    return DiscountSweep(columns['sku'], mrp, columns['cost'], np.asarray(columns['platform'], dtype=object),
+                         grid, unit, net_profit, settled_amount)
+
+
+def sweep_frame(sweep, metric='net_profit'):
+    # Wide SKU x discount table of one metric
+    if metric not in SWEEP_METRICS:
+        raise ValueError(f"Unknown sweep metric {metric!r}; expected one of {tuple(SWEEP_METRICS)}")
+    frame = pd.DataFrame(getattr(sweep, metric), columns=grid_labels(sweep))
+    frame.insert(0, "SKU", sweep.sku)
+    frame.insert(1, "Platform", sweep.platform)
+    frame.insert(2, "MRP", sweep.mrp)
+    frame.insert(3, "Cost_Price", sweep.cost)
+    return frame
+
+
+def write_sweep_archive(sweep, file):
+    # ZIP (deflate) holding one wide CSV per metric; file is a path or binary file
+    with zipfile.ZipFile(file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for metric, name in SWEEP_METRICS.items():
+            text = io.StringIO()
+            sweep_frame(sweep, metric).round(2).to_csv(text, index=False)
+            archive.writestr(f"{name}.csv", text.getvalue())
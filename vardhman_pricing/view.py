@@ -0,0 +1,67 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+RESULTS_PAGE_SIZES = (100, 500, 1000, 5000)
+PROFIT_COLUMNS = ('Net_Profit', 'Net_Profit_at_Target', 'Best_Net_Profit') # First one present is filtered on
+PLATFORM_COLUMNS = ('Platform', 'Best_Channel')
+
+# sku: case-insensitive substring; platforms: values to keep (empty keeps all);
+# min_profit / max_profit: inclusive bounds or None; sort_by: column name or None for input order
+ResultsQuery = namedtuple('ResultsQuery', ['sku', 'platforms', 'min_profit', 'max_profit', 'sort_by', 'ascending'],
+                          defaults=('', (), None, None, None, True))
+
+
+# --- Server-side filter / sort over an in-memory results frame ---
+# Only the requested page is materialized; the row order of the latest query is cached,
+# so moving between pages does not filter or sort again.
+class ResultsView:
+    def __init__(self, results):
+        self.results = results
+        self.profit_column = next((col for col in PROFIT_COLUMNS if col in results.columns), None)
+        self.platform_column = next((col for col in PLATFORM_COLUMNS if col in results.columns), None)
+        self._sku_keys = None
+        self._query = None
+        self._positions = None
+
+    def platforms(self):
+        if self.platform_column is None:
+            return []
+        return sorted(pd.unique(self.results[self.platform_column].dropna()).tolist(), key=str)
+
+    def positions(self, query):
+        if query == self._query:
+            return self._positions
+        results = self.results
+        mask = np.ones(len(results), dtype=bool)
+        if query.sku and 'SKU' in results.columns:
+            if self._sku_keys is None:
+                self._sku_keys = results['SKU'].astype('string[pyarrow]').str.lower()
+            mask &= self._sku_keys.str.contains(query.sku.strip().lower(), regex=False).fillna(False).to_numpy(dtype=bool)
+        if query.platforms and self.platform_column:
+            mask &= results[self.platform_column].isin(list(query.platforms)).to_numpy(dtype=bool)
+        if self.profit_column and (query.min_profit is not None or query.max_profit is not None):
+            profit = results[self.profit_column].to_numpy(dtype=float)
+            if query.min_profit is not None:
+                mask &= profit >= query.min_profit
+            if query.max_profit is not None:
+                mask &= profit <= query.max_profit
+        positions = np.flatnonzero(mask)
+
+        if query.sort_by is not None and len(positions):
+            # Stable, missing values last in either direction
+            column = results[query.sort_by].take(positions).reset_index(drop=True)
+            order = column.sort_values(ascending=query.ascending, kind='stable', na_position='last').index.to_numpy()
+            positions = positions[order]
+        self._query, self._positions = query, positions
+        return positions
+
+    def count(self, query):
+        return len(self.positions(query))
+
+    def page(self, query, page, page_size):
+        # Rows of 0-based page `page`, in query order
+        positions = self.positions(query)
+        return self.results.iloc[positions[page * page_size:(page + 1) * page_size]]